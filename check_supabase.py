@@ -3,39 +3,42 @@
 Check what's in Supabase
 """
 import os
+import sys
 from datetime import datetime, timedelta
-from supabase import create_client, Client
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent / "tools"))
+from postgrest_reader import count_rows, iter_rows
+
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase client
+# Supabase credentials
 url = os.getenv('SUPABASE_URL')
 key = os.getenv('SUPABASE_ANON_KEY')
-supabase: Client = create_client(url, key)
 
 print("🔍 Checking Supabase database...\n")
 
-# Get all articles
-response = supabase.table('articles').select('*').execute()
-articles = response.data
-
-print(f"📊 Total articles in database: {len(articles)}\n")
+# Stream all articles page by page (only the columns shown)
+total = 0
+for article in iter_rows(url, key, 'articles', 'title,published_date,source'):
+    if total == 0:
+        print("Articles found:")
+    total += 1
+    print(f"  - {article['title'][:60]}")
+    print(f"    Published: {article['published_date']}")
+    print(f"    Source: {article['source']}")
+    print()
 
-if articles:
-    print("Articles found:")
-    for article in articles:
-        print(f"  - {article['title'][:60]}")
-        print(f"    Published: {article['published_date']}")
-        print(f"    Source: {article['source']}")
-        print()
+print(f"📊 Total articles in database: {total}\n")
 
+if total:
     # Check 24 hour filter
     twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
     print(f"\n⏰ 24 hours ago: {twenty_four_hours_ago.isoformat()}")
 
-    response_24h = supabase.table('articles').select('*').gte('published_date', twenty_four_hours_ago.isoformat()).execute()
-    print(f"📊 Articles from last 24 hours: {len(response_24h.data)}")
+    recent = count_rows(url, key, 'articles', {'published_date': f'gte.{twenty_four_hours_ago.isoformat()}'})
+    print(f"📊 Articles from last 24 hours: {recent}")
 else:
     print("❌ No articles found in database!")
@@ -4,10 +4,15 @@ Quick script to load demo data into Supabase
 """
 import json
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent / "tools"))
+import dedupe_index
+
 # Load environment variables
 load_dotenv()
 
@@ -24,35 +29,19 @@ def load_demo_data():
     with open('demo-data.json', 'r') as f:
         articles = json.load(f)
 
-    success_count = 0
-    error_count = 0
-
-    for article in articles:
-        try:
-            # Remove 'id' from article as Supabase will auto-generate
-            article_data = {k: v for k, v in article.items() if k != 'id'}
-
-            # Check if article already exists by URL
-            existing = supabase.table('articles').select('id').eq('url', article_data['url']).execute()
-
-            if existing.data:
-                print(f"⏭️  Skipping (exists): {article_data['title'][:50]}...")
-            else:
-                # Insert article
-                result = supabase.table('articles').insert(article_data).execute()
-                print(f"✅ Saved: {article_data['title'][:50]}...")
-                success_count += 1
+    # Remove 'id' from articles as Supabase will auto-generate
+    articles = [{k: v for k, v in article.items() if k != 'id'} for article in articles]
 
-        except Exception as e:
-            print(f"❌ Error: {article_data.get('title', 'Unknown')[:50]}... - {e}")
-            error_count += 1
+    # Existing articles are found in the local index, not one query each
+    dedupe_index.warm(supabase)
+    stats = dedupe_index.save_new_and_changed(supabase, articles)
 
     print("\n" + "=" * 60)
     print("✅ DEMO DATA LOAD COMPLETE")
     print("=" * 60)
-    print(f"💾 Successfully saved: {success_count}")
-    print(f"⏭️  Skipped (duplicates): {len(articles) - success_count - error_count}")
-    print(f"❌ Errors: {error_count}")
+    print(f"💾 Successfully saved: {stats['success']}")
+    print(f"⏭️  Skipped (duplicates): {stats['skipped']}")
+    print(f"❌ Errors: {stats['errors']}")
 
 if __name__ == "__main__":
     load_demo_data()
@@ -0,0 +1,29 @@
+-- Migration: Bulk image_url updates
+-- Lets the maintenance tools update many rows' image_url in one request
+-- Called as POST /rest/v1/rpc/<function> with {"updates": [{"id": ..., "image_url": ...}, ...]}
+-- Runs with the caller's privileges, so the existing UPDATE policies still apply
+
+CREATE OR REPLACE FUNCTION bulk_update_article_images(updates JSONB)
+RETURNS SETOF UUID
+LANGUAGE sql
+AS $$
+    UPDATE articles AS a
+    SET image_url = u.image_url
+    FROM jsonb_to_recordset(updates) AS u(id UUID, image_url TEXT)
+    WHERE a.id = u.id
+    RETURNING a.id;
+$$;
+
+CREATE OR REPLACE FUNCTION bulk_update_enrichment_images(updates JSONB)
+RETURNS SETOF UUID
+LANGUAGE sql
+AS $$
+    UPDATE article_enrichments AS e
+    SET image_url = u.image_url
+    FROM jsonb_to_recordset(updates) AS u(id UUID, image_url TEXT)
+    WHERE e.id = u.id
+    RETURNING e.id;
+$$;
+
+COMMENT ON FUNCTION bulk_update_article_images(JSONB) IS 'Sets image_url for many articles at once; returns the ids that were updated';
+COMMENT ON FUNCTION bulk_update_enrichment_images(JSONB) IS 'Sets image_url for many enrichments at once; returns the ids that were updated';
@@ -0,0 +1,8 @@
+-- Migration: Enrichment content hashes
+-- Lets the save path compare freshly scraped enrichments with stored ones
+-- and write only positions whose content changed, instead of deleting and
+-- re-inserting every enrichment (which also cascaded into saved_enrichments)
+
+ALTER TABLE article_enrichments ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+COMMENT ON COLUMN article_enrichments.content_hash IS 'SHA-256 of title, summary, image_url and content; unchanged rows are not rewritten';
@@ -0,0 +1,17 @@
+-- Migration: Story ids
+-- Near-duplicate articles and enrichments (the same launch covered by
+-- several sources) share a story_id, assigned by tools/story_clusters.py
+-- when they are saved, so the dashboard can show each story once.
+-- content_hash covers story_id, so an enrichment that joins a story later
+-- is rewritten like any other change.
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS story_id UUID;
+ALTER TABLE article_enrichments ADD COLUMN IF NOT EXISTS story_id UUID;
+
+-- Merging two stories relabels rows by story_id
+CREATE INDEX IF NOT EXISTS idx_articles_story_id ON articles(story_id);
+CREATE INDEX IF NOT EXISTS idx_article_enrichments_story_id ON article_enrichments(story_id);
+
+COMMENT ON COLUMN articles.story_id IS 'Cluster of near-duplicate items across sources (MinHash/LSH)';
+COMMENT ON COLUMN article_enrichments.story_id IS 'Cluster of near-duplicate items across sources (MinHash/LSH)';
+COMMENT ON COLUMN article_enrichments.content_hash IS 'SHA-256 of title, summary, image_url, content and story_id; unchanged rows are not rewritten';
@@ -0,0 +1,13 @@
+-- Migration: Enrichment tags
+-- Topic tags assigned by tools/tagger.py when items are saved. Articles
+-- already have a tags column; enrichments get one here. content_hash now
+-- covers tags too, so tag changes are written like any other change.
+
+ALTER TABLE article_enrichments ADD COLUMN IF NOT EXISTS tags TEXT[] DEFAULT '{}';
+
+-- Filtering by tag (tags @> '{Agents}')
+CREATE INDEX IF NOT EXISTS idx_articles_tags ON articles USING GIN (tags);
+CREATE INDEX IF NOT EXISTS idx_article_enrichments_tags ON article_enrichments USING GIN (tags);
+
+COMMENT ON COLUMN article_enrichments.tags IS 'Topic tags from the offline tagger (hashed TF-IDF vs keyword centroids)';
+COMMENT ON COLUMN article_enrichments.content_hash IS 'SHA-256 of title, summary, image_url, content, tags and story_id; unchanged rows are not rewritten';
@@ -3,11 +3,21 @@ Modal App for AI News Scraper
 Runs scrapers every 24 hours and saves to Supabase
 """
 
+from pathlib import Path
+
 import modal
 
 # Create Modal app
 app = modal.App("ai-news-scraper")
 
+# Persistent scraper state (source cursors, caches) shared across runs
+STATE_DIR = "/state"
+state_volume = modal.Volume.from_name("ai-news-scraper-state", create_if_missing=True)
+
+# Dashboard feed snapshot (feed.json + .gz/.br), republished after every run
+SNAPSHOT_DIR = "/snapshot"
+snapshot_volume = modal.Volume.from_name("ai-news-feed-snapshot", create_if_missing=True)
+
 # Define the image with all dependencies
 image = modal.Image.debian_slim(python_version="3.11").pip_install(
     "requests==2.31.0",
@@ -18,14 +28,19 @@ image = modal.Image.debian_slim(python_version="3.11").pip_install(
     "praw==7.7.1",
     "python-dateutil==2.8.2",
     "lxml==5.1.0",
+    "numpy>=1.24",
+    "brotli==1.1.0",
+).env({"SCRAPER_STATE_DIR": STATE_DIR, "SCRAPER_SNAPSHOT_DIR": SNAPSHOT_DIR}).add_local_dir(
+    Path(__file__).parent / "tools", remote_path="/root/tools"
 )
 
 # Define secrets for environment variables
 @app.function(
     image=image,
     secrets=[modal.Secret.from_name("supabase-credentials")],
-    schedule=modal.Cron("0 0 * * *"),  # Run daily at midnight UTC
+    schedule=modal.Cron("0 0 * * *"),  # Run daily at midnight UTC (keep app.js SNAPSHOT_CONFIG in step)
     timeout=600,  # 10 minute timeout
+    volumes={STATE_DIR: state_volume, SNAPSHOT_DIR: snapshot_volume},
 )
 def run_scrapers():
     """
@@ -33,12 +48,17 @@ def run_scrapers():
     Scheduled to run every 24 hours.
     """
     import os
-    import requests
+    import sys
     from bs4 import BeautifulSoup
     import feedparser
     from datetime import datetime, timezone
     from supabase import create_client
     
+    sys.path.insert(0, "/root/tools")
+    import dedupe_index
+    import publish_snapshot
+    import source_cursor
+    
     print("🚀 Starting AI News Aggregator (Modal Scheduled Run)")
     print("=" * 60)
     
@@ -47,6 +67,13 @@ def run_scrapers():
     supabase_key = os.getenv('SUPABASE_ANON_KEY')
     supabase = create_client(supabase_url, supabase_key)
     
+    def publish_feed():
+        # Republish even when nothing was saved: the 24h window has moved
+        print("\n📦 PUBLISHING SNAPSHOT")
+        print("-" * 60)
+        if publish_snapshot.publish():
+            snapshot_volume.commit()
+    
     all_articles = []
     
     # ============================================
@@ -58,8 +85,13 @@ def run_scrapers():
         feed_url = "https://www.bensbites.co/feed"
         feed = feedparser.parse(feed_url)
         
+        cursor = source_cursor.load_cursor('bensbites')
         bensbites_articles = []
         for entry in feed.entries[:10]:  # Get last 10 articles
+            # Skip entries ingested on a previous run
+            if not source_cursor.is_new(cursor, entry.get('link', '')):
+                continue
+            
             article = {
                 'title': entry.get('title', 'No title'),
                 'url': entry.get('link', ''),
@@ -93,8 +125,13 @@ def run_scrapers():
         feed_url = "https://www.therundown.ai/feed"
         feed = feedparser.parse(feed_url)
         
+        cursor = source_cursor.load_cursor('rundown')
         rundown_articles = []
         for entry in feed.entries[:10]:  # Get last 10 articles
+            # Skip entries ingested on a previous run
+            if not source_cursor.is_new(cursor, entry.get('link', '')):
+                continue
+            
             article = {
                 'title': entry.get('title', 'No title'),
                 'url': entry.get('link', ''),
@@ -127,25 +164,15 @@ def run_scrapers():
     
     if all_articles:
         try:
-            stats = {'success': 0, 'skipped': 0, 'errors': 0}
+            # Duplicate detection is a local lookup against the persisted
+            # index; only new or changed articles reach the database
+            dedupe_index.warm(supabase)
+            stats = dedupe_index.save_new_and_changed(supabase, all_articles)
+            ingested = stats['saved']
             
-            for article in all_articles:
-                try:
-                    # Check if article already exists
-                    existing = supabase.table('articles').select('id').eq('url', article['url']).execute()
-                    
-                    if existing.data:
-                        print(f"⏭️  Skipped (duplicate): {article['title'][:50]}...")
-                        stats['skipped'] += 1
-                    else:
-                        # Insert new article
-                        supabase.table('articles').insert(article).execute()
-                        print(f"💾 Saved: {article['title'][:50]}...")
-                        stats['success'] += 1
-                        
-                except Exception as e:
-                    print(f"❌ Error saving article: {e}")
-                    stats['errors'] += 1
+            # Advance cursors and persist them (and the index) for the next scheduled run
+            source_cursor.record(ingested)
+            state_volume.commit()
             
             print("\n" + "=" * 60)
             print("✅ SCRAPER RUN COMPLETE")
@@ -155,6 +182,8 @@ def run_scrapers():
             print(f"⏭️  Skipped (duplicates): {stats['skipped']}")
             print(f"❌ Errors: {stats['errors']}")
             
+            publish_feed()
+            
             return {
                 "status": "success",
                 "total_articles": len(all_articles),
@@ -165,13 +194,15 @@ def run_scrapers():
             
         except Exception as e:
             print(f"❌ Failed to save to Supabase: {e}")
+            publish_feed()
             return {
                 "status": "error",
                 "message": str(e)
             }
     else:
-        print("⚠️  No articles collected from any source")
+        print("⚠️  No new articles collected from any source")
         print("=" * 60)
+        publish_feed()
         return {
             "status": "warning",
             "message": "No articles collected"
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Parsing Benchmark
+Compares pages parsed per second for the old html.parser path against the
+lxml and partial-parsing paths in html_parsing.py, and the old sibling-walk
+enrichment extraction against the single-pass segmenter
+
+Uses pages from the page cache when there are any, otherwise a synthetic
+Rundown-style issue.
+
+Usage:
+    python tools/bench_parsing.py [--seconds N]
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+import page_cache
+from html_parsing import PARSER, parse_content, parse_head, parse_html
+from scrape_rundown import extract_enrichments
+
+
+def synthetic_issue(items=12, paragraphs=6):
+    """Build a page shaped like a beehiiv newsletter issue"""
+    head = ["<head><title>The Rundown: Synthetic issue</title>"]
+    for i in range(40):
+        head.append(f'<meta name="meta-{i}" content="value {i}">')
+    head.append('<meta property="og:image" content="https://example.com/og.png">')
+    head.append('<script type="application/ld+json">{"@type": "NewsArticle", "datePublished": "2026-01-28T06:00:00Z"}</script>')
+    head.append("<script>" + "var x = 1;" * 2000 + "</script>")
+    head.append("</head>")
+
+    nav = "".join(f'<li><a href="/p/{i}">Link {i}</a></li>' for i in range(150))
+    body = [f"<body><nav><ul>{nav}</ul></nav><h1>Synthetic issue</h1><span>Jan 28, 2026</span>"]
+    body.append('<div id="content-blocks">')
+    for i in range(items):
+        body.append(f'<div><h4 class="hynlcx1 hynlcx5">News item {i}</h4></div>')
+        body.append(f'<div><img src="https://example.com/{i}.png"></div>')
+        body.append(f"<p><b>The Rundown:</b> Item {i} summary text that describes the launch in some detail.</p>")
+        for j in range(paragraphs):
+            body.append(f"<ul><li><p>Detail {j} of item {i}, with <a href='#'>a link</a> and some more words.</p></li></ul>")
+        body.append("<p><b>Why it matters:</b> Because it is a benchmark and needs realistic text.</p>")
+    body.append("</div>")
+    body.append("<footer>" + "<p>Footer text</p>" * 200 + "</footer></body>")
+
+    return ("<!DOCTYPE html><html>" + "".join(head) + "".join(body) + "</html>").encode()
+
+
+def cached_pages(limit=50):
+    """Load up to `limit` pages from the on-disk page cache"""
+    pages = []
+    if not page_cache.CACHE_DIR.exists():
+        return pages
+
+    for path in sorted(page_cache.CACHE_DIR.glob("*/*.gz"))[:limit]:
+        try:
+            pages.append(gzip.decompress(path.read_bytes()))
+        except (OSError, EOFError):
+            continue
+    return pages
+
+
+def legacy_extract_enrichments(article_soup):
+    """The previous sibling-walk extractor, kept only for comparison"""
+    enrichments = []
+    for idx, header in enumerate(article_soup.select("h4.hynlcx1.hynlcx5")):
+        enrichment = {"title": header.get_text(strip=True), "summary": "", "image_url": None, "content": "", "position": idx}
+        content_parts = []
+        current = header.parent.next_sibling
+        while current and len(content_parts) < 20:
+            if isinstance(current, str):
+                current = current.next_sibling
+                continue
+            if current.name == 'h4' or current.find('h4', class_='hynlcx1'):
+                break
+            if not enrichment["image_url"]:
+                img = current.find('img')
+                if img and img.get('src'):
+                    enrichment["image_url"] = img.get('src')
+            text = current.get_text(strip=True)
+            if text and len(text) > 10:
+                content_parts.append(text)
+            current = current.next_sibling
+        full_content = "\n\n".join(content_parts)
+        enrichment["content"] = full_content
+        match = re.search(r'The Rundown:\s*(.+?)(?:The details:|Why it matters:|$)', full_content, re.DOTALL | re.IGNORECASE)
+        if match:
+            enrichment["summary"] = match.group(1).strip()[:500]
+        elif content_parts:
+            enrichment["summary"] = content_parts[0][:500]
+        enrichments.append(enrichment)
+    return enrichments
+
+
+def bench(name, parse, pages, seconds):
+    """Parse the pages repeatedly for ~`seconds` and report pages/second"""
+    parsed = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for page in pages:
+            parse(page)
+        parsed += len(pages)
+    elapsed = time.perf_counter() - start
+
+    rate = parsed / elapsed
+    print(f"  {name:<32} {rate:>9.1f} pages/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parsing paths")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Time spent on each path")
+    args = parser.parse_args()
+
+    pages = cached_pages()
+    source = f"{len(pages)} cached pages"
+    if not pages:
+        pages = [synthetic_issue()]
+        source = "1 synthetic issue"
+
+    size_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"📊 Parsing benchmark: {source}, avg {size_kb:.0f} KB, default backend: {PARSER}\n")
+
+    baseline = bench("html.parser (full, old path)", lambda p: BeautifulSoup(p, "html.parser"), pages, args.seconds)
+    results = [
+        ("parse_html (full)", parse_html),
+        ("parse_head (<head> only)", parse_head),
+        ("parse_content (content only)", parse_content),
+    ]
+    for name, parse in results:
+        rate = bench(name, parse, pages, args.seconds)
+        print(f"  {'':<32} {rate / baseline:>8.1f}x vs old path")
+
+    # Segmentation runs on already-parsed trees, on a large issue
+    soups = [parse_content(synthetic_issue(items=20, paragraphs=60))]
+    print(f"\n📊 Enrichment segmentation: large synthetic issue (20 items x 60 paragraphs)\n")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy_items = legacy_extract_enrichments(soups[0])
+        items = extract_enrichments(soups[0])
+    legacy_chars = sum(len(e["content"]) for e in legacy_items)
+    chars = sum(len(e["content"]) for e in items)
+
+    baseline = bench("sibling walk (old)", legacy_extract_enrichments, soups, args.seconds)
+    with contextlib.redirect_stdout(io.StringIO()):
+        rate = bench("single pass", extract_enrichments, soups, args.seconds)
+    print(f"  {'single pass':<32} {rate:>9.1f} pages/s")
+    print(f"  {'':<32} {rate / baseline:>8.1f}x vs old path")
+    print(f"\n  Content kept: {legacy_chars} chars (old, capped at 20 blocks) vs {chars} chars")
+
+
+if __name__ == "__main__":
+    main()
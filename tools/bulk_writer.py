@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Bulk Writer
+Accumulates image_url updates and writes them in batches through one RPC
+call each (see migrations/004_bulk_update_image_urls.sql), instead of one
+PATCH per row
+"""
+
+import time
+
+import http_client
+
+# Rows sent per RPC call
+DEFAULT_BATCH_SIZE = 200
+
+# Pending rows are flushed once the oldest has waited this long (seconds),
+# checked whenever a row is added
+DEFAULT_FLUSH_INTERVAL = 30.0
+
+# Bulk update function for each table
+RPC_FUNCTIONS = {
+    "articles": "bulk_update_article_images",
+    "article_enrichments": "bulk_update_enrichment_images",
+}
+
+
+class ImageUrlWriter:
+    """
+    Batched image_url updater for one table
+
+    Use as a context manager so the last partial batch is flushed:
+
+        with ImageUrlWriter(SUPABASE_URL, ANON_KEY, "articles") as writer:
+            writer.add(article_id, image_url)
+
+    If a batch call fails (e.g. the migration hasn't been applied yet), that
+    batch falls back to per-row PATCH requests so nothing is lost. Rows that
+    still can't be written end up in `failures`.
+    """
+
+    def __init__(self, supabase_url, api_key, table, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.supabase_url = supabase_url
+        self.table = table
+        self.rpc = RPC_FUNCTIONS[table]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.headers = {
+            "apikey": api_key,
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+        self.pending = []
+        self.oldest_pending = None
+        self.updated = 0
+        self.failures = []  # (row id, image_url, error message)
+        self.requests = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def add(self, row_id, image_url):
+        """Queue one row's new image_url, flushing if the batch is due"""
+        if not self.pending:
+            self.oldest_pending = time.monotonic()
+        self.pending.append({"id": row_id, "image_url": image_url})
+
+        if len(self.pending) >= self.batch_size or time.monotonic() - self.oldest_pending >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write all pending rows"""
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        try:
+            self.requests += 1
+            response = http_client.post(
+                f"{self.supabase_url}/rest/v1/rpc/{self.rpc}",
+                headers=self.headers,
+                json={"updates": batch},
+            )
+            response.raise_for_status()
+            updated_ids = set(response.json())
+        except Exception as e:
+            print(f"   ⚠️  Bulk update of {len(batch)} {self.table} rows failed ({e}), retrying row by row")
+            self._flush_rows(batch)
+            return
+
+        for row in batch:
+            if row["id"] in updated_ids:
+                self.updated += 1
+            else:
+                self.failures.append((row["id"], row["image_url"], "Row not found"))
+
+    def _flush_rows(self, batch):
+        """Fallback: one PATCH per row"""
+        headers = dict(self.headers, Prefer="return=minimal")
+
+        for row in batch:
+            try:
+                self.requests += 1
+                response = http_client.patch(
+                    f"{self.supabase_url}/rest/v1/{self.table}",
+                    headers=headers,
+                    params={"id": f"eq.{row['id']}"},
+                    json={"image_url": row["image_url"]},
+                )
+                response.raise_for_status()
+                self.updated += 1
+            except Exception as e:
+                self.failures.append((row["id"], row["image_url"], str(e)))
+
+    def report(self, label):
+        """Print a summary of the writes and any per-row failures"""
+        print(f"   💾 {label}: {self.updated} updated in {self.requests} write requests")
+        for row_id, image_url, error in self.failures:
+            print(f"   ❌ Failed to update {row_id} -> {(image_url or 'None')[:60]}: {error}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Dedupe Index
+Local SQLite mirror of the articles already in Supabase (url -> id and a
+content fingerprint), so ingestion can tell new, changed and unchanged
+articles apart without one existence query per article
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+import postgrest_reader
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+DB_FILE = STATE_DIR / "dedupe_index.sqlite3"
+
+# Article fields covered by the fingerprint
+FINGERPRINT_FIELDS = ("title", "summary", "author", "published_date")
+WARM_COLUMNS = "id,url," + ",".join(FINGERPRINT_FIELDS)
+
+# Fields the image repair tools (set_default_images, update_missing_images,
+# fix_broken_images) rewrite in place. They are not fingerprinted, since an
+# incremental warm never sees those repairs, and they are only sent for new
+# articles, so a re-scraped article never undoes a repair
+REPAIRABLE_FIELDS = ("image_url",)
+
+# Rows per page when warming from Supabase
+WARM_PAGE_SIZE = 1000
+
+# A full re-read of the table happens at most this often (seconds); in
+# between, warming only reads rows created since the previous warm
+FULL_WARM_INTERVAL = int(os.getenv("SCRAPER_DEDUPE_FULL_WARM", str(7 * 24 * 60 * 60)))
+
+# Overlap applied to incremental warms, for clock skew and slow commits
+WARM_OVERLAP_SECONDS = 10 * 60
+
+
+@contextmanager
+def _db():
+    """Open the index for one operation, committing on success"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    try:
+        _init(conn)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS articles (
+            url TEXT PRIMARY KEY,
+            id TEXT,
+            fingerprint TEXT NOT NULL,
+            synced_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+
+def fingerprint(article):
+    """Content fingerprint of an article; equal fingerprints mean nothing to write"""
+    values = []
+    for field in FINGERPRINT_FIELDS:
+        value = article.get(field)
+        if field == "published_date" and value:
+            # Supabase returns timestamps in its own format; compare instants
+            try:
+                value = datetime.fromisoformat(str(value).replace("Z", "+00:00")).astimezone(timezone.utc).isoformat()
+            except ValueError:
+                pass
+        values.append(value)
+    return hashlib.sha256(json.dumps(values, ensure_ascii=False, default=str).encode()).hexdigest()
+
+
+def remember(articles):
+    """
+    Record articles that are now stored in Supabase
+
+    Args:
+        articles: Article dicts with "url" (and "id" when known)
+    """
+    now = time.time()
+    with _db() as conn:
+        conn.executemany(
+            "INSERT INTO articles (url, id, fingerprint, synced_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET id = COALESCE(excluded.id, articles.id), "
+            "fingerprint = excluded.fingerprint, synced_at = excluded.synced_at",
+            [(a["url"], a.get("id"), fingerprint(a), now) for a in articles if a.get("url")],
+        )
+
+
+def warm(supabase, page_size=WARM_PAGE_SIZE, full=None):
+    """
+    Bring the index up to date with the articles table
+
+    The first warm (and one every FULL_WARM_INTERVAL) pages through the
+    whole table with keyset pagination; later ones only read rows created
+    since the last warm.
+
+    Args:
+        supabase: Supabase client
+        page_size: Rows per request
+        full: Force (True) or skip (False) a full re-read; None decides by age
+
+    Returns:
+        int: Rows read
+    """
+    with _db() as conn:
+        state = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+
+    started = time.time()
+    if full is None:
+        full = started - state.get("full_warm", 0) > FULL_WARM_INTERVAL
+
+    query_since = None
+    if not full and "warm" in state:
+        query_since = datetime.fromtimestamp(state["warm"] - WARM_OVERLAP_SECONDS, tz=timezone.utc).isoformat()
+
+    filters = {"created_at": f"gte.{query_since}"} if query_since else None
+    rows = postgrest_reader.iter_rows(
+        supabase.supabase_url, supabase.supabase_key, "articles", WARM_COLUMNS,
+        filters=filters, page_size=page_size,
+    )
+
+    read = 0
+    while True:
+        page = list(islice(rows, page_size))
+        if not page:
+            break
+        remember(page)
+        read += len(page)
+
+    with _db() as conn:
+        if full:
+            # Anything not seen in a full read is gone from the table
+            conn.execute("DELETE FROM articles WHERE synced_at < ?", (started,))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('full_warm', ?)", (started,))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('warm', ?)", (started,))
+
+    print(f"🗂️  Dedupe index warmed ({'full' if full else 'incremental'}): {read} rows read")
+    return read
+
+
+def classify(articles):
+    """
+    Split articles by what the database already holds, with local lookups only
+
+    Args:
+        articles: Article dicts with "url"
+
+    Returns:
+        tuple: (new, changed, unchanged) lists of articles
+    """
+    new, changed, unchanged = [], [], []
+    with _db() as conn:
+        for article in articles:
+            row = conn.execute("SELECT fingerprint FROM articles WHERE url = ?", (article["url"],)).fetchone()
+            if row is None:
+                new.append(article)
+            elif row[0] != fingerprint(article):
+                changed.append(article)
+            else:
+                unchanged.append(article)
+    return new, changed, unchanged
+
+
+def save_new_and_changed(supabase, articles):
+    """
+    Write only the articles the index doesn't already hold unchanged
+
+    New articles go in one upsert (on_conflict url) and changed ones, without
+    their REPAIRABLE_FIELDS, in another; each falls back to one upsert per
+    article if it fails, and they are recorded in the index as they succeed.
+
+    Args:
+        supabase: Supabase client
+        articles: Article dicts (columns of the articles table)
+
+    Returns:
+        dict: {"success", "skipped", "errors", "saved": articles now stored}
+    """
+    new, changed, unchanged = classify(articles)
+    stats = {"success": 0, "skipped": len(unchanged), "errors": 0, "saved": list(unchanged)}
+
+    for article in unchanged:
+        print(f"⏭️  Skipped (duplicate): {article['title'][:50]}...")
+
+    # Separate upserts: rows of one request must share their columns, or
+    # the missing ones are written as null
+    _upsert(supabase, new, new, stats)
+    _upsert(
+        supabase, changed,
+        [{k: v for k, v in article.items() if k not in REPAIRABLE_FIELDS} for article in changed],
+        stats,
+    )
+    return stats
+
+
+def _upsert(supabase, articles, rows, stats):
+    """Upsert rows (payloads for articles) in one request, or one by one if that fails"""
+    if not rows:
+        return
+
+    try:
+        response = supabase.table("articles").upsert(rows, on_conflict="url").execute()
+        stored = response.data or []
+        remember(stored)
+        stored_urls = {row["url"] for row in stored}
+        for article in articles:
+            if article["url"] in stored_urls:
+                print(f"💾 Saved: {article['title'][:50]}...")
+                stats["success"] += 1
+                stats["saved"].append(article)
+            else:
+                stats["errors"] += 1
+                print(f"❌ Not saved: {article['title'][:50]}...")
+        return
+    except Exception as e:
+        print(f"⚠️  Bulk upsert of {len(rows)} articles failed ({e}), saving one by one")
+
+    for article, row in zip(articles, rows):
+        try:
+            response = supabase.table("articles").upsert(row, on_conflict="url").execute()
+            remember(response.data or [row])
+            print(f"💾 Saved: {article['title'][:50]}...")
+            stats["success"] += 1
+            stats["saved"].append(article)
+        except Exception as e:
+            print(f"❌ Error saving article: {e}")
+            stats["errors"] += 1
+
+
+def clear():
+    """Forget everything; the next warm re-reads the whole table"""
+    with _db() as conn:
+        conn.execute("DELETE FROM articles")
+        conn.execute("DELETE FROM meta")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        clear()
+        print("🧹 Dedupe index cleared")
+    else:
+        with _db() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            state = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        last = datetime.fromtimestamp(state["warm"]).isoformat(timespec="seconds") if "warm" in state else "never"
+        print(f"🗂️  {count} indexed articles, last warmed {last}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Enrichment Images
+Resolves images for many enrichments at once: each parent article page is
+fetched and parsed once, and every enrichment gets the image of its own
+news item (matched by position), falling back to the page's lead image
+"""
+
+from urllib.parse import urljoin
+
+from fetch_engine import iter_fetch
+from html_parsing import parse_content, parse_html
+from page_metadata import extract_metadata, extract_page_metadata
+from scrape_rundown import extract_enrichments
+
+# PostgREST select for enrichments with their parent URL embedded, so no
+# per-enrichment parent lookup is needed
+ENRICHMENT_SELECT = "id,title,article_id,position,image_url,articles(url)"
+
+
+def parent_url(enrichment):
+    """Parent article URL from an enrichment row fetched with ENRICHMENT_SELECT"""
+    parent = enrichment.get("articles") or {}
+    return parent.get("url")
+
+
+def group_by_parent(enrichments):
+    """
+    Group enrichment rows by their parent article URL
+
+    Returns:
+        tuple: (dict of parent URL -> enrichments, list of enrichments without a parent)
+    """
+    groups = {}
+    orphans = []
+    for enrichment in enrichments:
+        url = parent_url(enrichment)
+        if url:
+            groups.setdefault(url, []).append(enrichment)
+        else:
+            orphans.append(enrichment)
+    return groups, orphans
+
+
+def _pick(candidates, accept):
+    """First candidate that is set and passes `accept` (if given)"""
+    for candidate in candidates:
+        if candidate and (accept is None or accept(candidate)):
+            return candidate
+    return None
+
+
+def images_from_page(page_url, content, enrichments, accept=None):
+    """
+    Resolve images for the enrichments of one parsed parent page
+
+    Args:
+        page_url: Parent article URL
+        content: Parent page body
+        enrichments: Enrichment rows belonging to this page
+        accept: Optional predicate an image URL must pass (e.g. a load check)
+
+    Returns:
+        dict: Mapping of enrichment id to image URL (None if nothing usable)
+    """
+    items = extract_enrichments(parse_content(content))
+    lead_images = extract_page_metadata(content, base_url=page_url)["images"]
+    body_images = None
+
+    resolved = {}
+    for enrichment in enrichments:
+        position = enrichment.get("position")
+        item_image = None
+        if position is not None and 0 <= position < len(items) and items[position]["image_url"]:
+            item_image = urljoin(page_url, items[position]["image_url"])
+
+        image = _pick([item_image, *lead_images], accept)
+        if image is None:
+            # The body's own lead image candidates, parsed only when needed
+            if body_images is None:
+                body_images = extract_metadata(parse_html(content), base_url=page_url)["images"]
+            image = _pick([i for i in body_images if i not in lead_images], accept)
+        resolved[enrichment["id"]] = image
+    return resolved
+
+
+def iter_resolved_images(enrichments, accept=None):
+    """
+    Resolve images for enrichment rows, fetching each parent page once
+
+    Parent pages are fetched concurrently (and served from the page cache
+    when possible), so the requests made grow with the number of parent
+    articles, not enrichments.
+
+    Args:
+        enrichments: Rows fetched with ENRICHMENT_SELECT
+        accept: Optional predicate an image URL must pass
+
+    Yields:
+        tuple: (enrichment row, image URL or None, error message or None)
+    """
+    groups, orphans = group_by_parent(enrichments)
+
+    for enrichment in orphans:
+        yield enrichment, None, "Could not find parent article"
+
+    for page_url, content, error in iter_fetch(groups):
+        if error:
+            for enrichment in groups[page_url]:
+                yield enrichment, None, f"Could not fetch parent article: {error}"
+            continue
+
+        try:
+            resolved = images_from_page(page_url, content, groups[page_url], accept=accept)
+        except Exception as e:
+            for enrichment in groups[page_url]:
+                yield enrichment, None, f"Could not extract image: {e}"
+            continue
+
+        for enrichment in groups[page_url]:
+            yield enrichment, resolved[enrichment["id"]], None
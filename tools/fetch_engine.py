@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Async Fetch Engine
+Fetches many pages concurrently with bounded per-host concurrency
+"""
+
+import asyncio
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import page_cache
+
+# Maximum number of in-flight requests against a single host
+PER_HOST_LIMIT = 4
+
+# Worker threads running the blocking HTTP calls
+MAX_WORKERS = 32
+
+
+class DeadlineExceeded(Exception):
+    """Raised for pages still in flight when the caller's deadline passed"""
+
+
+def _fetch_page(url, timeout):
+    """Blocking fetch of a single page (runs in a worker thread)"""
+    return page_cache.fetch_page(url, timeout=timeout)
+
+
+async def _call_bounded(call, url, semaphores, per_host, limit, executor):
+    """Run call(url) in a worker thread while holding its host's and a global slot"""
+    host = urlsplit(url).netloc.lower()
+    semaphore = semaphores.setdefault(host, asyncio.Semaphore(per_host))
+
+    # Host slot first, so a URL waiting on a busy host doesn't hold a global one
+    async with semaphore, limit:
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(executor, call, url)
+            return url, result, None
+        except Exception as e:
+            return url, None, e
+
+
+async def _stream_async(call, urls, per_host, max_workers, deadline, executor, emit):
+    """Run call over all URLs, handing each result to `emit` as soon as it completes"""
+    semaphores = {}
+    limit = asyncio.Semaphore(max_workers)
+    tasks = {
+        asyncio.ensure_future(_call_bounded(call, url, semaphores, per_host, limit, executor)): url
+        for url in dict.fromkeys(urls)
+    }
+    if not tasks:
+        return
+
+    loop = asyncio.get_running_loop()
+    wait_timeout = None if deadline is None else max(0, deadline - time.monotonic())
+    emitted = set()
+
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=wait_timeout):
+            result = await next_done
+            emitted.add(result[0])
+            # emit blocks while the consumer's buffer is full (backpressure)
+            if not await loop.run_in_executor(executor, emit, result):
+                break
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task, url in tasks.items():
+            task.cancel()
+            if url not in emitted:
+                emit((url, None, DeadlineExceeded(f"Deadline passed before {url} was fetched")))
+
+
+def iter_map(call, urls, per_host=PER_HOST_LIMIT, max_workers=MAX_WORKERS, deadline=None, buffer_size=8):
+    """
+    Run a blocking per-URL function concurrently and yield results as they complete
+
+    Concurrency is bounded globally by `max_workers` and per host by
+    `per_host`. At most `buffer_size` results wait for the consumer; beyond
+    that the workers block, so memory stays bounded however many URLs there are.
+
+    Args:
+        call: Blocking function taking a URL (runs in a worker thread)
+        urls: Iterable of URLs (duplicates are only run once)
+        per_host: Maximum concurrent calls per host
+        max_workers: Maximum concurrent calls overall
+        deadline: time.monotonic() value after which pending calls are cancelled
+        buffer_size: Maximum results held before the consumer takes them
+
+    Yields:
+        tuple: (url, result or None, exception or None) in completion order
+    """
+    results = queue.Queue(maxsize=buffer_size)
+    closed = threading.Event()
+    done = object()
+
+    def emit(item):
+        while not closed.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        # One extra worker for the emit calls, so a blocked consumer never
+        # starves the calls themselves
+        executor = ThreadPoolExecutor(max_workers=max_workers + 1, thread_name_prefix="fetch")
+        try:
+            asyncio.run(_stream_async(call, urls, per_host, max_workers, deadline, executor, emit))
+        finally:
+            # Don't wait for calls abandoned at the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+            emit(done)
+
+    producer = threading.Thread(target=produce, name="fetch-engine", daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        closed.set()
+
+
+def iter_fetch(urls, per_host=PER_HOST_LIMIT, timeout=None, deadline=None, buffer_size=8):
+    """
+    Fetch URLs concurrently and yield each page as soon as it arrives
+
+    Args:
+        urls: Iterable of page URLs
+        per_host: Maximum concurrent requests per host
+        timeout: Per-request timeout in seconds (defaults to the shared client's)
+        deadline: time.monotonic() value after which pending fetches are cancelled
+        buffer_size: Maximum fetched pages held before the consumer takes them
+
+    Yields:
+        tuple: (url, content bytes or None, exception or None) in completion order
+    """
+    yield from iter_map(
+        functools.partial(_fetch_page, timeout=timeout), urls,
+        per_host=per_host, deadline=deadline, buffer_size=buffer_size,
+    )
+
+
+def fetch_all(urls, per_host=PER_HOST_LIMIT, timeout=None, deadline=None):
+    """
+    Fetch all URLs concurrently and return them together
+
+    Wall-clock time grows with the slowest page rather than the sum of
+    all pages, since every host gets `per_host` requests in flight over
+    the shared keep-alive pool. Pages still in the page cache are not
+    downloaded again.
+
+    Returns:
+        dict: Mapping of URL to (content bytes or None, exception or None)
+    """
+    return {
+        url: (content, error)
+        for url, content, error in iter_fetch(urls, per_host=per_host, timeout=timeout, deadline=deadline)
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    start = time.monotonic()
+    pages = fetch_all(sys.argv[1:])
+    elapsed = time.monotonic() - start
+
+    for url, (content, error) in pages.items():
+        if error:
+            print(f"❌ {url}: {error}")
+        else:
+            print(f"✅ {url}: {len(content)} bytes")
+
+    print(f"\n⏱️  Fetched {len(pages)} pages in {elapsed:.2f}s")
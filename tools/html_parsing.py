@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+HTML Parsing
+Shared BeautifulSoup construction: lxml by default, with partial parsing
+helpers so callers only build the part of the tree they actually read
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# Only <head>: enough for og:/twitter: meta tags, <title>, JSON-LD
+HEAD_STRAINER = SoupStrainer("head")
+
+# Content container of a beehiiv post (The Rundown); holds every news item
+CONTENT_STRAINER = SoupStrainer(id="content-blocks")
+
+_HEAD_END = b"</head>"
+
+
+def parse_html(markup, parse_only=None):
+    """
+    Parse markup with the fastest available backend
+
+    Args:
+        markup: HTML as bytes or str
+        parse_only: Optional SoupStrainer restricting which elements are built
+
+    Returns:
+        BeautifulSoup: Parsed document (or the strained fragment)
+    """
+    return BeautifulSoup(markup, PARSER, parse_only=parse_only)
+
+
+def parse_head(markup):
+    """
+    Parse only the document <head>
+
+    The markup is cut right after </head> before parsing, so the body is
+    never tokenized at all.
+
+    Args:
+        markup: HTML as bytes or str (a streamed head-only prefix is fine)
+
+    Returns:
+        BeautifulSoup: Fragment containing the <head> element
+    """
+    if isinstance(markup, str):
+        end = markup.lower().find(_HEAD_END.decode())
+    else:
+        end = markup.lower().find(_HEAD_END)
+
+    if end != -1:
+        markup = markup[:end + len(_HEAD_END)]
+
+    return parse_html(markup, parse_only=HEAD_STRAINER)
+
+
+def parse_content(markup):
+    """
+    Parse only the article content container, falling back to the whole
+    document for pages that don't have one
+
+    Args:
+        markup: HTML as bytes or str
+
+    Returns:
+        BeautifulSoup: Content container fragment or full document
+    """
+    soup = parse_html(markup, parse_only=CONTENT_STRAINER)
+    if soup.find(True) is None:
+        return parse_html(markup)
+    return soup
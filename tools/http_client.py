@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client
+One pooled, keep-alive session for every scraper and maintenance tool
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Timeouts in seconds, overridable per environment or per call
+DEFAULT_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "10"))
+CONNECT_TIMEOUT = float(os.getenv("SCRAPER_HTTP_CONNECT_TIMEOUT", "5"))
+
+# Connection pool sizing (per host)
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 16
+
+# Retry policy for 5xx responses and dropped connections. Other methods
+# (POST, PATCH) are only retried when the request never reached the server
+MAX_RETRIES = int(os.getenv("SCRAPER_HTTP_RETRIES", "3"))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _accept_encoding():
+    """Advertise brotli only when urllib3 can actually decode it"""
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        pass
+    try:
+        import brotlicffi  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "User-Agent": USER_AGENT,
+                    "Accept-Encoding": _accept_encoding(),
+                    "Connection": "keep-alive",
+                })
+                _session = session
+
+    return _session
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _failed_before_send(error):
+    """True if a connection error happened while connecting, before any of the request was sent"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    # urllib3's NewConnectionError (refused, DNS failure) subclasses ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def request(method, url, *, timeout=None, retries=MAX_RETRIES, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session
+
+    Retries connection errors and 5xx responses for idempotent methods, and
+    only failures to connect for the rest, with jittered exponential backoff.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        timeout: Read timeout in seconds (defaults to DEFAULT_TIMEOUT)
+        retries: Maximum number of retries after the first attempt
+        **kwargs: Passed through to requests.Session.request
+
+    Returns:
+        requests.Response: The final response (status is not checked)
+    """
+    method = method.upper()
+    read_timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    session = get_session()
+
+    attempt = 0
+    while True:
+        try:
+            response = session.request(
+                method, url, timeout=(min(CONNECT_TIMEOUT, read_timeout), read_timeout), **kwargs
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries or (method not in IDEMPOTENT_METHODS and not _failed_before_send(e)):
+                raise
+        else:
+            if (
+                response.status_code not in RETRY_STATUSES
+                or method not in IDEMPOTENT_METHODS
+                or attempt >= retries
+            ):
+                return response
+            response.close()
+
+        time.sleep(_backoff_delay(attempt))
+        attempt += 1
+
+
+def get(url, **kwargs) -> requests.Response:
+    """GET through the shared session"""
+    return request("GET", url, **kwargs)
+
+
+def head(url, **kwargs) -> requests.Response:
+    """HEAD through the shared session"""
+    kwargs.setdefault("allow_redirects", True)
+    return request("HEAD", url, **kwargs)
+
+
+def post(url, **kwargs) -> requests.Response:
+    """POST through the shared session (retried only if it couldn't connect)"""
+    return request("POST", url, **kwargs)
+
+
+def patch(url, **kwargs) -> requests.Response:
+    """PATCH through the shared session (retried only if it couldn't connect)"""
+    return request("PATCH", url, **kwargs)
+
+
+def delete(url, **kwargs) -> requests.Response:
+    """DELETE through the shared session"""
+    return request("DELETE", url, **kwargs)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+HTTP Validator Store
+Persists ETag / Last-Modified per URL so scrapers can send conditional GETs
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import http_client
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+VALIDATORS_FILE = STATE_DIR / "http_validators.json"
+
+_lock = threading.Lock()
+
+
+def _load():
+    """Load the validator store from disk"""
+    try:
+        with open(VALIDATORS_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save(validators):
+    """Atomically write the validator store to disk"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = VALIDATORS_FILE.with_suffix(".json.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(validators, f, indent=2)
+    os.replace(tmp_file, VALIDATORS_FILE)
+
+
+def conditional_get(url, **kwargs):
+    """
+    GET a URL, sending If-None-Match / If-Modified-Since when we have them
+
+    Args:
+        url: URL to fetch
+        **kwargs: Passed through to http_client.get
+
+    Returns:
+        requests.Response: 304 when the resource is unchanged since the
+        last remembered response, otherwise the full response
+    """
+    with _lock:
+        stored = _load().get(url, {})
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if stored.get("etag"):
+        headers["If-None-Match"] = stored["etag"]
+    if stored.get("last_modified"):
+        headers["If-Modified-Since"] = stored["last_modified"]
+
+    return http_client.get(url, headers=headers, **kwargs)
+
+
+def validators(url, response):
+    """
+    The validators of a fully processed response, for remember()
+
+    Scrapers yield these as a {"validators": ...} record after their last
+    article record; the save path stores them only once every record the
+    source produced has been saved, so a failed save or a skipped article
+    means a full fetch (not a 304) on the next run.
+
+    Args:
+        url: URL the response was fetched from
+        response: requests.Response with status 200
+
+    Returns:
+        dict: {"url", "etag", "last_modified"}
+    """
+    return {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def remember(entries):
+    """
+    Store validators so the next run can send a conditional GET
+
+    Args:
+        entries: Dicts from validators(); a URL whose response had none is
+            forgotten
+    """
+    if not entries:
+        return
+
+    with _lock:
+        stored = _load()
+        for entry in entries:
+            if entry.get("etag") or entry.get("last_modified"):
+                stored[entry["url"]] = {"etag": entry.get("etag"), "last_modified": entry.get("last_modified")}
+            else:
+                stored.pop(entry["url"], None)
+        _save(stored)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Image Probe
+Checks many image URLs concurrently and streams back whether each one loads
+Results are kept in probe_cache, so URLs checked recently are not probed again
+"""
+
+import sqlite3
+import time
+from itertools import islice
+
+import http_client
+import probe_cache
+from fetch_engine import iter_map
+
+# Seconds to wait for each probe request
+PROBE_TIMEOUT = 5
+
+# Probes in flight overall and against a single host (CDNs tolerate more
+# parallel HEADs than article pages)
+MAX_IN_FLIGHT = 64
+PER_HOST_LIMIT = 8
+
+# Statuses some CDNs answer HEAD with even though GET works
+HEAD_REJECTED_STATUSES = frozenset({403, 405, 501})
+
+# Fresh probe results written to the cache per transaction
+RECORD_BATCH = 100
+
+
+def _result(url, response=None, error=None):
+    """Build a probe result from a HEAD or ranged GET response"""
+    if response is None:
+        return {"url": url, "ok": False, "status": None, "content_type": None, "size": None, "error": str(error)}
+
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower() or None
+
+    # bytes 0-0/12345 on a ranged GET, Content-Length on a HEAD
+    size = None
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+        size = int(content_range.rsplit("/", 1)[1])
+    elif response.headers.get("Content-Length", "").isdigit() and response.status_code == 200:
+        size = int(response.headers["Content-Length"])
+
+    ok = response.status_code in (200, 206) and not (content_type or "").startswith("text/")
+    return {"url": url, "ok": ok, "status": response.status_code, "content_type": content_type, "size": size, "error": None}
+
+
+def probe(url, timeout=PROBE_TIMEOUT):
+    """
+    Check whether an image URL loads
+
+    Sends a HEAD first. If the server rejects HEAD or the request fails,
+    retries with a GET for the first byte only (Range: bytes=0-0), so no
+    image body is downloaded either way.
+
+    Args:
+        url: Image URL
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        dict: {"url", "ok", "status", "content_type", "size", "error"}
+    """
+    try:
+        response = http_client.head(url, timeout=timeout, retries=0)
+        response.close()
+        if response.status_code not in HEAD_REJECTED_STATUSES:
+            return _result(url, response)
+    except Exception:
+        pass
+
+    try:
+        response = http_client.get(url, timeout=timeout, retries=0, stream=True, headers={"Range": "bytes=0-0"})
+        response.close()
+        return _result(url, response)
+    except Exception as e:
+        return _result(url, error=e)
+
+
+def _cached(urls):
+    """Cache lookup that treats an unusable cache as all-stale"""
+    try:
+        return probe_cache.lookup(urls)
+    except sqlite3.Error as e:
+        print(f"   ⚠️  Probe cache unavailable: {e}")
+        return {}
+
+
+def _record_quietly(results):
+    """Cache store that never fails the caller"""
+    if not results:
+        return
+    try:
+        probe_cache.record(results)
+    except (OSError, sqlite3.Error) as e:
+        print(f"   ⚠️  Could not cache probe results: {e}")
+
+
+def check(url, timeout=PROBE_TIMEOUT):
+    """
+    Probe a single image URL unless a fresh cached result exists
+
+    Returns:
+        dict: Probe result (see probe())
+    """
+    cached = _cached([url]).get(url)
+    if cached:
+        return cached
+
+    result = probe(url, timeout=timeout)
+    _record_quietly([result])
+    return result
+
+
+def iter_probe(urls, per_host=PER_HOST_LIMIT, max_in_flight=MAX_IN_FLIGHT, timeout=PROBE_TIMEOUT, use_cache=True):
+    """
+    Probe image URLs concurrently and yield each result as soon as it completes
+
+    Fresh results from probe_cache are yielded first (marked "cached") and
+    only the stale or unknown URLs are probed, so the work per run follows
+    how many images changed or came due rather than how many there are.
+    Every new result is written back to the cache.
+
+    Args:
+        urls: Iterable of image URLs (empty values and duplicates are skipped)
+        per_host: Maximum concurrent probes per host
+        max_in_flight: Maximum concurrent probes overall
+        timeout: Per-request timeout in seconds
+        use_cache: Set to False to recheck every URL regardless of the cache
+
+    Yields:
+        dict: Probe result (see probe()), in completion order
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+
+    stale = urls
+    if use_cache:
+        cached = _cached(urls)
+        for result in cached.values():
+            yield dict(result, cached=True)
+        stale = [url for url in urls if url not in cached]
+
+    def run(url):
+        return probe(url, timeout=timeout)
+
+    pending = []
+    try:
+        for url, result, error in iter_map(run, stale, per_host=per_host, max_workers=max_in_flight, buffer_size=64):
+            result = result if result is not None else _result(url, error=error)
+            pending.append(result)
+            if len(pending) >= RECORD_BATCH:
+                _record_quietly(pending)
+                pending = []
+            yield result
+    finally:
+        _record_quietly(pending)
+
+
+def iter_broken(rows, chunk_size=500, **kwargs):
+    """
+    Yield the rows whose image_url doesn't load, as rows stream in
+
+    Rows are probed in chunks, so a generator of rows (e.g. from
+    postgrest_reader.iter_rows) is checked in constant memory.
+
+    Args:
+        rows: Iterable of dicts with an "image_url" key
+        chunk_size: Rows probed together
+        **kwargs: Passed through to iter_probe
+
+    Yields:
+        dict: Rows with a missing or broken image
+    """
+    checked = probed = cached = broken = 0
+    start = time.monotonic()
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        results = {}
+        for result in iter_probe((row.get("image_url") for row in chunk), **kwargs):
+            results[result["url"]] = result
+            if result.get("cached"):
+                cached += 1
+            else:
+                probed += 1
+
+        checked += len(chunk)
+        for row in chunk:
+            if not results.get(row.get("image_url"), {}).get("ok"):
+                broken += 1
+                yield row
+
+        print(f"   🔎 Checked {checked} images...")
+
+    print(
+        f"   🔎 Checked {checked} images in {time.monotonic() - start:.1f}s "
+        f"({probed} probed, {cached} from cache, {broken} broken or missing)"
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    for result in iter_probe(sys.argv[1:]):
+        icon = "✅" if result["ok"] else "❌"
+        print(f"{icon} {result['url']}: {result['status']} {result['content_type']} {result['size']} {result['error'] or ''}")
@@ -1,65 +1,194 @@
 #!/usr/bin/env python3
 """
 Orchestrator
-Runs all scrapers and saves results to Supabase
+Streams articles from all scrapers concurrently into a Supabase writer stage
 """
 
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Add tools directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from scrape_bensbites import scrape_bensbites
-from scrape_rundown import scrape_rundown
-from save_to_supabase import save_articles
+from scrape_bensbites import iter_bensbites
+from scrape_rundown import iter_rundown
+from save_to_supabase import SAVE_BATCH_SIZE, save_batches
+from publish_snapshot import publish
 
-def main():
-    """Run all scrapers and save to Supabase"""
-    print("🚀 Starting AI News Aggregator Orchestrator\n")
-    print("=" * 60)
-    
-    all_articles = []
-    
-    # Run Ben's Bites scraper
-    print("\n1️⃣  BEN'S BITES")
-    print("-" * 60)
+# Registered sources; each yields {"article", "enrichments"} records (and a
+# final {"source", "validators"} one once fully processed), gets a
+# time.monotonic() deadline and is given up on once deadline_seconds have passed
+SOURCES = [
+    {"name": "bensbites", "label": "BEN'S BITES", "scrape": iter_bensbites, "deadline_seconds": 120},
+    {"name": "rundown", "label": "THE RUNDOWN AI", "scrape": iter_rundown, "deadline_seconds": 300},
+]
+
+# Extra time a source gets after its deadline to finish its current record
+DEADLINE_GRACE_SECONDS = 5
+
+# Records buffered between the scrapers and the writer; scrapers block
+# (backpressure) when the writer falls this far behind
+QUEUE_SIZE = 16
+
+# The writer saves records in micro-batches: up to SAVE_BATCH_SIZE records,
+# or whatever has arrived within this many seconds of the batch's first one
+BATCH_LINGER_SECONDS = 2.0
+
+_END_OF_STREAM = object()
+
+
+def _run_source(source, deadline, records, cancelled, counts, finished):
+    """Thread target: stream one scraper's records into the shared queue"""
+    counts[source["name"]] = 0
     try:
-        bensbites_articles = scrape_bensbites()
-        all_articles.extend(bensbites_articles)
+        for record in source["scrape"](deadline=deadline):
+            # Wait for room in the queue, but never past the deadline
+            while not cancelled.is_set():
+                try:
+                    records.put(record, timeout=0.5)
+                    if "article" in record:
+                        counts[source["name"]] += 1
+                    break
+                except queue.Full:
+                    if time.monotonic() > deadline:
+                        cancelled.set()
+            if cancelled.is_set():
+                break
     except Exception as e:
-        print(f"❌ Ben's Bites scraper failed: {e}")
-    
-    # Run The Rundown AI scraper
-    print("\n2️⃣  THE RUNDOWN AI")
-    print("-" * 60)
+        print(f"❌ {source['label']} scraper failed: {e}")
+    finally:
+        finished[source["name"]] = time.monotonic()
+
+
+def _drain_batches(records, batch_size=SAVE_BATCH_SIZE, linger=BATCH_LINGER_SECONDS):
+    """Yield micro-batches of records from the queue until the end-of-stream marker"""
+    while True:
+        record = records.get()
+        if record is _END_OF_STREAM:
+            return
+
+        batch = [record]
+        batch_deadline = time.monotonic() + linger
+        while len(batch) < batch_size:
+            try:
+                record = records.get(timeout=max(0, batch_deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if record is _END_OF_STREAM:
+                yield batch
+                return
+            batch.append(record)
+
+        yield batch
+
+
+def _write(records, stats, cancel_events):
+    """Thread target: save batches from the queue; on failure, stop every source"""
     try:
-        rundown_articles = scrape_rundown()
-        all_articles.extend(rundown_articles)
+        stats.update(save_batches(_drain_batches(records)))
     except Exception as e:
-        print(f"❌ The Rundown AI scraper failed: {e}")
-    
-    # Save to Supabase
-    print("\n3️⃣  SAVING TO SUPABASE")
-    print("-" * 60)
-    if all_articles:
+        print(f"❌ Supabase writer failed: {e}")
+        # Nothing drains the queue any more; sources give up instead of blocking
+        for event in cancel_events:
+            event.set()
+
+
+def run_pipeline(sources=SOURCES):
+    """
+    Run all sources concurrently and save their records as they arrive
+
+    Each source is a generator running in its own daemon thread. Records go
+    through a bounded queue to a single writer thread, which saves them in
+    bulk micro-batches, so database writes overlap with network fetches and
+    memory stays flat however many articles a run produces. Sources stop
+    cooperatively at their deadline; one that still hasn't returned after
+    the grace period is abandoned. If the writer fails, every source is
+    cancelled and the run ends with whatever statistics exist.
+
+    Returns:
+        dict: Save statistics from save_batches
+    """
+    start = time.monotonic()
+    records = queue.Queue(maxsize=QUEUE_SIZE)
+    counts = {}
+    finished = {}
+    stats = {}
+    cancel_events = [threading.Event() for _ in sources]
+
+    writer = threading.Thread(
+        target=_write,
+        args=(records, stats, cancel_events),
+        name="supabase-writer",
+    )
+    writer.start()
+
+    threads = []
+    for source, cancelled in zip(sources, cancel_events):
+        deadline = start + source["deadline_seconds"]
+        print(f"▶️  Starting {source['label']} (deadline {source['deadline_seconds']}s)")
+        thread = threading.Thread(
+            target=_run_source,
+            args=(source, deadline, records, cancelled, counts, finished),
+            name=f"source-{source['name']}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append((source, deadline, cancelled, thread))
+
+    for source, deadline, cancelled, thread in sorted(threads, key=lambda t: t[1]):
+        thread.join(timeout=max(0, deadline + DEADLINE_GRACE_SECONDS - time.monotonic()))
+
+        if thread.is_alive():
+            cancelled.set()
+            print(f"⏰ {source['label']} missed its {source['deadline_seconds']}s deadline, cancelled")
+        else:
+            elapsed = finished[source["name"]] - start
+            print(f"✅ {source['label']}: {counts.get(source['name'], 0)} articles in {elapsed:.1f}s")
+
+    # A failed writer no longer drains the queue, so never block on a full one
+    while writer.is_alive():
         try:
-            stats = save_articles(all_articles)
-            
-            print("\n" + "=" * 60)
-            print("✅ ORCHESTRATOR COMPLETE")
-            print("=" * 60)
-            print(f"📊 Total articles collected: {len(all_articles)}")
-            print(f"💾 Successfully saved: {stats['success']}")
-            print(f"⏭️  Skipped (duplicates): {stats['skipped']}")
-            print(f"❌ Errors: {stats['errors']}")
-            
-        except Exception as e:
-            print(f"❌ Failed to save to Supabase: {e}")
-            print("💡 Make sure you've configured .env with Supabase credentials")
-    else:
+            records.put(_END_OF_STREAM, timeout=0.5)
+            break
+        except queue.Full:
+            continue
+    writer.join()
+
+    stats["collected"] = sum(counts.values())
+    return stats
+
+
+def main():
+    """Run all scrapers and stream their results into Supabase"""
+    print("🚀 Starting AI News Aggregator Orchestrator\n")
+    print("=" * 60)
+
+    print("\n🔄 SCRAPING AND SAVING")
+    print("-" * 60)
+    stats = run_pipeline()
+
+    # Republish even when nothing was collected: the 24h window has moved
+    print("\n📦 PUBLISHING SNAPSHOT")
+    print("-" * 60)
+    publish()
+
+    print("\n" + "=" * 60)
+    if not stats.get("collected"):
         print("⚠️  No articles collected from any source")
         print("=" * 60)
+        return
+
+    print("✅ ORCHESTRATOR COMPLETE")
+    print("=" * 60)
+    print(f"📊 Total articles collected: {stats['collected']}")
+    articles = stats.get("articles", {})
+    print(f"💾 Successfully saved: {articles.get('success', 0)}")
+    print(f"⏭️  Skipped (duplicates): {articles.get('skipped', 0)}")
+    print(f"❌ Errors: {articles.get('errors', 0)}")
+    print(f"🔍 Enrichments saved: {stats.get('enrichments', {}).get('success', 0)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Page Cache
+Persistent on-disk cache of fetched pages, shared by every tool in tools/
+Entries expire after a TTL and the cache is kept under a byte budget (LRU)
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import http_client
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+CACHE_DIR = STATE_DIR / "page_cache"
+INDEX_FILE = CACHE_DIR / "index.sqlite3"
+
+# How long a cached page is served without re-downloading (seconds)
+DEFAULT_TTL = int(os.getenv("SCRAPER_PAGE_CACHE_TTL", str(6 * 60 * 60)))
+
+# Total size of compressed bodies kept on disk (bytes)
+MAX_BYTES = int(os.getenv("SCRAPER_PAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Streaming head fetches stop at </head> or after this many bytes
+HEAD_MAX_BYTES = 256 * 1024
+HEAD_CHUNK_SIZE = 16 * 1024
+_HEAD_END = b"</head>"
+
+# Query parameters that never change page content
+TRACKING_PREFIX = "utm_"
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "_bhlid"})
+
+
+def normalize_url(url):
+    """
+    Normalize a URL so equivalent spellings share one cache entry
+
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    parameters and trailing slashes, and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith(TRACKING_PREFIX) or k.lower() in TRACKING_PARAMS)
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _key(url, variant=None):
+    base = normalize_url(url)
+    if variant:
+        base = f"{variant}:{base}"
+    return hashlib.sha256(base.encode()).hexdigest()
+
+
+def _body_path(key):
+    return CACHE_DIR / key[:2] / f"{key}.gz"
+
+
+@contextmanager
+def _index():
+    """Open the cache index for one operation, committing on success"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(INDEX_FILE, timeout=30)
+    try:
+        _init(conn)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+
+
+def _remove(conn, key):
+    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+    try:
+        _body_path(key).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def get(url, variant=None):
+    """
+    Return the cached body for a URL, or None if missing or expired
+
+    Args:
+        url: Page URL (normalized before lookup)
+        variant: Optional entry kind stored alongside the full page (e.g. "head")
+
+    Returns:
+        bytes: Decompressed page body, or None
+    """
+    key = _key(url, variant)
+    now = time.time()
+
+    with _index() as conn:
+        row = conn.execute("SELECT expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+
+        if row[0] <= now:
+            _remove(conn, key)
+            return None
+
+        try:
+            body = gzip.decompress(_body_path(key).read_bytes())
+        except (FileNotFoundError, OSError, EOFError):
+            _remove(conn, key)
+            return None
+
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        return body
+
+
+def put(url, body, ttl=DEFAULT_TTL, variant=None):
+    """
+    Store a page body, then evict expired and least-recently-used entries
+    until the cache fits in MAX_BYTES
+
+    Args:
+        url: Page URL
+        body: Raw page bytes
+        ttl: Seconds until the entry expires
+        variant: Optional entry kind stored alongside the full page (e.g. "head")
+    """
+    key = _key(url, variant)
+    now = time.time()
+    compressed = gzip.compress(body, compresslevel=6)
+
+    path = _body_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(compressed)
+    os.replace(tmp_path, path)
+
+    with _index() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, url, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, normalize_url(url), len(compressed), now + ttl, now),
+        )
+        _evict(conn, now)
+
+
+def _evict(conn, now):
+    """Drop expired entries, then LRU entries while over the byte budget"""
+    for (key,) in conn.execute("SELECT key FROM entries WHERE expires_at <= ?", (now,)).fetchall():
+        _remove(conn, key)
+
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if total <= MAX_BYTES:
+        return
+
+    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+        _remove(conn, key)
+        total -= size
+        if total <= MAX_BYTES:
+            break
+
+
+def fetch_page(url, ttl=DEFAULT_TTL, timeout=None):
+    """
+    Return a page body, downloading it only on a cache miss
+
+    Args:
+        url: Page URL
+        ttl: Seconds a freshly downloaded page stays cached
+        timeout: Request timeout (defaults to the shared client's)
+
+    Returns:
+        bytes: Page body
+
+    Raises:
+        requests.HTTPError: If the download returns an error status
+    """
+    body = _get_or_none(url)
+    if body is not None:
+        return body
+
+    response = http_client.get(url, timeout=timeout)
+    response.raise_for_status()
+    body = response.content
+
+    _put_quietly(url, body, ttl)
+    return body
+
+
+def _get_or_none(url, variant=None):
+    """Cache lookup that treats an unusable cache as a miss"""
+    try:
+        return get(url, variant=variant)
+    except sqlite3.Error as e:
+        print(f"    ⚠️  Page cache unavailable: {e}")
+        return None
+
+
+def _put_quietly(url, body, ttl, variant=None):
+    """Cache store that never fails the caller"""
+    try:
+        put(url, body, ttl=ttl, variant=variant)
+    except (OSError, sqlite3.Error) as e:
+        print(f"    ⚠️  Could not cache page: {e}")
+
+
+def fetch_head(url, ttl=DEFAULT_TTL, timeout=None, max_bytes=HEAD_MAX_BYTES):
+    """
+    Return the page up to and including </head>, reading the response
+    incrementally and closing it as soon as the head is complete
+
+    Serves the full cached page when there is one, so callers can always
+    hand the result to html_parsing.parse_head.
+
+    Args:
+        url: Page URL
+        ttl: Seconds a freshly downloaded head stays cached
+        timeout: Request timeout (defaults to the shared client's)
+        max_bytes: Stop reading after this many bytes even without </head>
+
+    Returns:
+        bytes: Head prefix of the page (or the full page if cached)
+
+    Raises:
+        requests.HTTPError: If the download returns an error status
+    """
+    body = _get_or_none(url)
+    if body is None:
+        body = _get_or_none(url, variant="head")
+    if body is not None:
+        return body
+
+    response = http_client.get(url, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+
+        chunks = []
+        received = 0
+        for chunk in response.iter_content(chunk_size=HEAD_CHUNK_SIZE):
+            chunks.append(chunk)
+            received += len(chunk)
+
+            # Only the newest chunk (plus a tag-sized overlap) can hold </head>
+            window = b"".join(chunks[-2:]).lower()
+            if _HEAD_END in window or received >= max_bytes:
+                break
+    finally:
+        response.close()
+
+    body = b"".join(chunks)
+    end = body.lower().find(_HEAD_END)
+    if end != -1:
+        body = body[:end + len(_HEAD_END)]
+
+    _put_quietly(url, body, ttl, variant="head")
+    return body
+
+
+def clear():
+    """Remove every cached page"""
+    with _index() as conn:
+        for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+            _remove(conn, key)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        clear()
+        print("🧹 Page cache cleared")
+    else:
+        with _index() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        print(f"📦 {count} cached pages, {total / 1024 / 1024:.1f} MB of {MAX_BYTES / 1024 / 1024:.0f} MB")
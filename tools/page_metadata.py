@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Page Metadata
+Extracts title, published time, author, lead image and description from an
+article page in one pass over the document, preferring structured data
+(JSON-LD, OpenGraph, article:published_time) over layout heuristics
+"""
+
+import json
+import re
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+
+from dateutil import parser as date_parser
+
+import page_cache
+from html_parsing import parse_head, parse_html
+
+# Elements the single pass looks at; everything else is skipped by find_all
+METADATA_TAGS = ["meta", "script", "title", "h1", "h3", "p", "time", "img", "span"]
+
+# Meta tags (property= or name=) carrying each field, in priority order
+TITLE_META = ("og:title", "twitter:title")
+DESCRIPTION_META = ("og:description", "twitter:description", "description")
+IMAGE_META = ("og:image", "og:image:secure_url", "og:image:url", "twitter:image", "twitter:image:src")
+PUBLISHED_META = ("article:published_time", "og:published_time", "datePublished", "pubdate", "publish-date", "date", "parsely-pub-date", "sailthru.date")
+AUTHOR_META = ("article:author", "author", "twitter:creator")
+
+# JSON-LD objects read for metadata; a WebPage's fields only fill in what
+# no article object provides
+ARTICLE_TYPES = {"Article", "NewsArticle", "BlogPosting", "Report", "TechArticle"}
+PAGE_TYPES = {"WebPage"}
+FEATURED_IMAGE_CLASSES = {"featured-image", "post-image", "hero-image"}
+
+# Visible date like "Jan 28, 2026", the last-resort published date
+DATE_TEXT_RE = re.compile(r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},\s+\d{4}")
+
+
+def parse_timestamp(value):
+    """Parse an ISO-8601 or free-form date into an aware UTC datetime (or None)"""
+    if not value or not isinstance(value, str):
+        return None
+
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = date_parser.parse(value.strip())
+        except (ValueError, OverflowError):
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _ld_objects(data):
+    """Yield every dict in a JSON-LD payload, flattening lists and @graph"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _ld_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _ld_objects(data["@graph"])
+
+
+def _ld_name(value):
+    """Author fields may be a string, an object or a list of either"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        return value.get("name") or value.get("url")
+    return value if isinstance(value, str) else None
+
+
+def _ld_url(value):
+    """Image fields may be a URL string, an ImageObject or a list of either"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        return value.get("url") or value.get("contentUrl")
+    return value if isinstance(value, str) else None
+
+
+def _read_json_ld(text, found):
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return
+
+    # Rank of the object each ld_ field came from (0 article, 1 page); a
+    # field is taken from the first object of the best rank that has it
+    ranks = found.setdefault("ld_ranks", {})
+    for obj in _ld_objects(data):
+        types = obj.get("@type")
+        types = set(types) if isinstance(types, list) else {types}
+        if types & ARTICLE_TYPES:
+            rank = 0
+        elif types & PAGE_TYPES:
+            rank = 1
+        else:
+            continue
+        for field, value in (
+            ("ld_title", obj.get("headline") or obj.get("name")),
+            ("ld_published", obj.get("datePublished")),
+            ("ld_author", _ld_name(obj.get("author"))),
+            ("ld_image", _ld_url(obj.get("image"))),
+            ("ld_description", obj.get("description")),
+        ):
+            if value and rank < ranks.get(field, 2):
+                found[field] = value
+                ranks[field] = rank
+
+
+def _collect(soup):
+    """Meta tags and first-seen field candidates of a document, in one pass"""
+    meta = {}
+    found = {}
+
+    for tag in soup.find_all(METADATA_TAGS):
+        name = tag.name
+
+        if name == "meta":
+            key = tag.get("property") or tag.get("name") or tag.get("itemprop")
+            content = tag.get("content")
+            if key and content:
+                meta.setdefault(key.strip(), content.strip())
+
+        elif name == "script":
+            if (tag.get("type") or "").lower() == "application/ld+json":
+                _read_json_ld(tag.string, found)
+
+        elif name == "img":
+            src = tag.get("src")
+            if not src:
+                continue
+            if "article_img" not in found and tag.find_parent("article") is not None:
+                found["article_img"] = src
+            if "featured_img" not in found and FEATURED_IMAGE_CLASSES & set(tag.get("class") or ()):
+                found["featured_img"] = src
+
+        elif name == "time":
+            if tag.get("datetime"):
+                found.setdefault("time", tag["datetime"])
+
+        elif name == "span":
+            if "date_text" not in found:
+                match = DATE_TEXT_RE.search(tag.get_text(strip=True))
+                if match:
+                    found["date_text"] = match.group(0)
+
+        elif name not in found:
+            # title, h1, h3, p: first occurrence only
+            text = tag.get_text(strip=True)
+            if text:
+                found[name] = text
+
+    return meta, found
+
+
+def _first_meta(meta, keys):
+    return next((meta[k] for k in keys if meta.get(k)), None)
+
+
+def _structured(meta, found):
+    """
+    True if structured data settles every field, so body heuristics (h1,
+    <time>, visible dates, first paragraph) couldn't change the result
+    """
+    return bool(
+        (found.get("ld_title") or _first_meta(meta, TITLE_META))
+        and parse_timestamp(found.get("ld_published") or _first_meta(meta, PUBLISHED_META))
+        and (found.get("ld_description") or _first_meta(meta, DESCRIPTION_META))
+        and (_first_meta(meta, IMAGE_META) or found.get("ld_image"))
+    )
+
+
+def _assemble(meta, found, base_url):
+    title = found.get("ld_title") or _first_meta(meta, TITLE_META) or found.get("h1") or found.get("title")
+
+    published = None
+    for candidate in (found.get("ld_published"), _first_meta(meta, PUBLISHED_META), found.get("time"), found.get("date_text")):
+        published = parse_timestamp(candidate)
+        if published:
+            break
+
+    author = found.get("ld_author")
+    if not author:
+        author = next((meta[k] for k in AUTHOR_META if meta.get(k) and not meta[k].startswith("http")), None)
+
+    description = (
+        found.get("ld_description") or _first_meta(meta, DESCRIPTION_META)
+        or found.get("h3") or found.get("p") or ""
+    )
+
+    images = []
+    for candidate in [meta.get(k) for k in IMAGE_META] + [
+        found.get("ld_image"), found.get("article_img"), found.get("featured_img")
+    ]:
+        if not candidate:
+            continue
+        candidate = urljoin(base_url, candidate) if base_url else candidate
+        if candidate not in images:
+            images.append(candidate)
+
+    return {
+        "title": title,
+        "published": published,
+        "author": author,
+        "image_url": images[0] if images else None,
+        "description": description,
+        "images": images,
+    }
+
+
+def extract_metadata(soup, base_url=None):
+    """
+    Extract article metadata from a parsed page in a single pass
+
+    Works on a full document or a head-only fragment (body heuristics are
+    then simply absent).
+
+    Args:
+        soup: BeautifulSoup document or fragment
+        base_url: Page URL, used to resolve relative image URLs
+
+    Returns:
+        dict: {
+            "title", "published" (aware datetime or None), "author",
+            "image_url", "description",
+            "images": candidate image URLs in priority order
+        }
+    """
+    meta, found = _collect(soup)
+    return _assemble(meta, found, base_url)
+
+
+def extract_page_metadata(markup, base_url=None):
+    """
+    Extract article metadata from a fetched page, parsing only its <head>
+    when structured data there settles every field
+
+    Otherwise the whole document is parsed for the body heuristics. Title,
+    published time, description and lead image match extract_metadata on
+    the full document either way; a head-only result just lacks the body's
+    lower-priority "images" candidates (an <img> inside <article>, a
+    featured image).
+
+    Args:
+        markup: HTML as bytes or str
+        base_url: Page URL, used to resolve relative image URLs
+
+    Returns:
+        dict: As extract_metadata
+    """
+    meta, found = _collect(parse_head(markup))
+    if _structured(meta, found):
+        return _assemble(meta, found, base_url)
+    return extract_metadata(parse_html(markup), base_url=base_url)
+
+
+def iter_image_candidates(url):
+    """
+    Yield candidate lead images for a page, cheapest first
+
+    Candidates from the streamed <head> come first. The full page is only
+    downloaded and parsed if the caller keeps asking for more.
+
+    Args:
+        url: Article URL
+
+    Yields:
+        str: Absolute image URLs in priority order, without duplicates
+    """
+    seen = set()
+
+    for fetch, parse in ((page_cache.fetch_head, parse_head), (page_cache.fetch_page, parse_html)):
+        for image in extract_metadata(parse(fetch(url)), base_url=url)["images"]:
+            if image not in seen:
+                seen.add(image)
+                yield image
+
+
+if __name__ == "__main__":
+    import sys
+
+    for page_url in sys.argv[1:]:
+        metadata = extract_metadata(parse_html(page_cache.fetch_page(page_url)), base_url=page_url)
+        print(f"\n🔗 {page_url}")
+        for field in ("title", "published", "author", "image_url", "description"):
+            print(f"  {field}: {metadata[field]}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+PostgREST Reader
+Streams rows from a Supabase table page by page with keyset pagination,
+so reads stay correct past the server's row limit and use constant memory
+"""
+
+import http_client
+
+# Rows fetched per request (PostgREST caps responses at its max-rows setting,
+# 1000 by default on Supabase)
+DEFAULT_PAGE_SIZE = 500
+
+# Keyset column: every table read this way has a uuid primary key "id", so
+# the cursor is unique, never null and served by the primary key index
+KEY_COLUMN = "id"
+
+
+def iter_rows(base_url, api_key, table, columns, filters=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Yield rows of a table in primary key order, one page at a time
+
+    Each page continues after the last row's id instead of using an offset,
+    so rows inserted or updated mid-read don't shift pages and every request
+    is a range scan of the primary key index. The order is arbitrary but
+    stable; callers that need another order sort what they read.
+
+    Args:
+        base_url: Supabase project URL
+        api_key: API key sent as apikey and bearer token
+        table: Table name
+        columns: Columns to select, as a list or comma-separated string
+            (id is always added for the cursor)
+        filters: Optional dict of PostgREST filters, e.g. {"image_url": "is.null"}
+        page_size: Rows per request
+
+    Yields:
+        dict: One row at a time
+    """
+    if isinstance(columns, str):
+        columns = [c.strip() for c in columns.split(",") if c.strip()]
+    columns = list(dict.fromkeys([*columns, KEY_COLUMN]))
+
+    filters = dict(filters or {})
+    if KEY_COLUMN in filters:
+        raise ValueError(f"iter_rows uses the '{KEY_COLUMN}' parameter for its cursor; use and=(...) filters instead")
+
+    base_url = base_url.rstrip("/")
+    headers = {
+        "apikey": api_key,
+        "Authorization": f"Bearer {api_key}",
+    }
+    params = {
+        "select": ",".join(columns),
+        "order": f"{KEY_COLUMN}.asc",
+        "limit": str(page_size),
+        **filters,
+    }
+
+    while True:
+        response = http_client.get(f"{base_url}/rest/v1/{table}", headers=headers, params=params)
+        response.raise_for_status()
+        rows = response.json()
+
+        yield from rows
+
+        if len(rows) < page_size:
+            return
+
+        params[KEY_COLUMN] = f"gt.{rows[-1][KEY_COLUMN]}"
+
+
+def count_rows(base_url, api_key, table, filters=None):
+    """
+    Count matching rows without transferring them
+
+    Returns:
+        int: Exact row count
+    """
+    headers = {
+        "apikey": api_key,
+        "Authorization": f"Bearer {api_key}",
+        "Prefer": "count=exact",
+        "Range-Unit": "items",
+        "Range": "0-0",
+    }
+    response = http_client.get(
+        f"{base_url.rstrip('/')}/rest/v1/{table}",
+        headers=headers,
+        params={"select": "id", **(filters or {})},
+    )
+    response.raise_for_status()
+    return int(response.headers.get("Content-Range", "*/0").rsplit("/", 1)[1])
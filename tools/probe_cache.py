@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Probe Cache
+Persistent record of image probe outcomes, so repeated sweeps only recheck
+URLs whose result has gone stale
+
+Working images are rechecked after OK_TTL. Failing ones are rechecked
+sooner, backing off exponentially while they keep failing.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+DB_FILE = STATE_DIR / "probe_cache.sqlite3"
+
+# Seconds before a working image is probed again
+OK_TTL = int(os.getenv("SCRAPER_PROBE_OK_TTL", str(7 * 24 * 60 * 60)))
+
+# Seconds before a failing image is probed again: FAIL_TTL after the first
+# failure, doubling with each consecutive failure up to FAIL_TTL_MAX
+FAIL_TTL = int(os.getenv("SCRAPER_PROBE_FAIL_TTL", str(60 * 60)))
+FAIL_TTL_MAX = 24 * 60 * 60
+
+# SQLite caps bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+
+@contextmanager
+def _db():
+    """Open the probe database for one operation, committing on success"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    try:
+        _init(conn)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS probes (
+            url TEXT PRIMARY KEY,
+            ok INTEGER NOT NULL,
+            status INTEGER,
+            content_type TEXT,
+            size INTEGER,
+            error TEXT,
+            failures INTEGER NOT NULL DEFAULT 0,
+            checked_at REAL NOT NULL,
+            recheck_at REAL NOT NULL
+        )
+        """
+    )
+
+
+def _recheck_after(ok, failures):
+    if ok:
+        return OK_TTL
+    return min(FAIL_TTL_MAX, FAIL_TTL * 2 ** max(0, failures - 1))
+
+
+def lookup(urls, now=None):
+    """
+    Return cached probe results that are still fresh
+
+    Args:
+        urls: Iterable of image URLs
+        now: Reference time (defaults to time.time())
+
+    Returns:
+        dict: Mapping of URL to probe result, for fresh entries only
+    """
+    now = time.time() if now is None else now
+    urls = list(dict.fromkeys(url for url in urls if url))
+    fresh = {}
+
+    with _db() as conn:
+        for i in range(0, len(urls), _LOOKUP_CHUNK):
+            chunk = urls[i:i + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT url, ok, status, content_type, size, error, checked_at FROM probes "
+                f"WHERE recheck_at > ? AND url IN ({placeholders})",
+                (now, *chunk),
+            )
+            for url, ok, status, content_type, size, error, checked_at in rows:
+                fresh[url] = {
+                    "url": url, "ok": bool(ok), "status": status, "content_type": content_type,
+                    "size": size, "error": error, "checked_at": checked_at,
+                }
+
+    return fresh
+
+
+def record(results, now=None):
+    """
+    Store probe results and schedule their rechecks
+
+    Args:
+        results: Iterable of probe result dicts (see image_probe.probe)
+        now: Check time (defaults to time.time())
+    """
+    now = time.time() if now is None else now
+
+    with _db() as conn:
+        for result in results:
+            row = conn.execute("SELECT failures FROM probes WHERE url = ?", (result["url"],)).fetchone()
+            failures = 0 if result["ok"] else (row[0] if row else 0) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO probes "
+                "(url, ok, status, content_type, size, error, failures, checked_at, recheck_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result["url"], int(result["ok"]), result["status"], result["content_type"],
+                    result["size"], result["error"], failures, now, now + _recheck_after(result["ok"], failures),
+                ),
+            )
+
+
+def clear():
+    """Forget every probe result"""
+    with _db() as conn:
+        conn.execute("DELETE FROM probes")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        clear()
+        print("🧹 Probe cache cleared")
+    else:
+        with _db() as conn:
+            total, ok, due = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(ok), 0), COALESCE(SUM(recheck_at <= ?), 0) FROM probes",
+                (time.time(),),
+            ).fetchone()
+        print(f"🔎 {total} probed images: {ok} working, {total - ok} failing, {due} due for recheck")
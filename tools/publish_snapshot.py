@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Publish Snapshot
+Writes the dashboard's feed (last 24h of articles with their enrichment
+summaries) as one precompressed JSON document for static serving, so a page
+load is a single small cached request instead of four Supabase queries
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+import postgrest_reader
+import related_index
+
+try:
+    import brotli
+except ImportError:  # the .br variant is skipped; gzip is always written
+    brotli = None
+
+load_dotenv()
+
+# Served next to index.html as data/feed.json (+ .gz / .br)
+SNAPSHOT_DIR = Path(os.getenv("SCRAPER_SNAPSHOT_DIR", Path(__file__).parent.parent / "data"))
+SNAPSHOT_NAME = "feed.json"
+
+# Articles published within this many hours are included
+WINDOW_HOURS = 24
+
+# Related coverage from earlier days attached to each card
+RELATED_PER_ITEM = 3
+
+# Only what the cards render; enrichment content stays in the database
+ARTICLE_COLUMNS = [
+    "id", "title", "url", "source", "author", "published_date", "summary", "image_url", "story_id",
+    "article_enrichments(id,position,title,summary,image_url,story_id)",
+]
+
+
+def build_snapshot(base_url, api_key, window_hours=WINDOW_HOURS, now=None):
+    """
+    Read the feed from Supabase into a snapshot document
+
+    Articles and their enrichments come back from one embedded select,
+    streamed with keyset pagination.
+
+    Args:
+        base_url: Supabase project URL
+        api_key: API key
+        window_hours: How far back published_date may be
+        now: Reference time (defaults to the current time)
+
+    Returns:
+        dict: {"version", "generated_at", "since", "etag", "articles"}
+    """
+    now = now or datetime.now(timezone.utc)
+    since = (now - timedelta(hours=window_hours)).isoformat()
+
+    articles = []
+    for row in postgrest_reader.iter_rows(
+        base_url, api_key, "articles", ARTICLE_COLUMNS,
+        filters={"published_date": f"gte.{since}"},
+    ):
+        enrichments = sorted(row.pop("article_enrichments", None) or [], key=lambda e: e.get("position") or 0)
+        row["enrichments"] = enrichments
+        articles.append(row)
+
+    articles.sort(key=lambda a: a.get("published_date") or "", reverse=True)
+    _attach_related(articles)
+
+    # The ETag only covers the feed contents, so an unchanged feed keeps it
+    body = json.dumps(articles, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    etag = hashlib.sha256(body.encode()).hexdigest()[:32]
+
+    return {
+        "version": 1,
+        "generated_at": now.isoformat(),
+        "since": since,
+        "etag": etag,
+        "articles": articles,
+    }
+
+
+def _attach_related(articles):
+    """Add precomputed related stories to articles and enrichments that have some"""
+    items = {}
+    for article in articles:
+        items[f"a:{article['url']}"] = article
+        for enrichment in article["enrichments"]:
+            items[f"e:{article['url']}#{enrichment.get('position')}"] = enrichment
+
+    try:
+        related = related_index.related(items, limit=RELATED_PER_ITEM)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  Related stories unavailable: {e}")
+        return
+
+    for key, neighbours in related.items():
+        items[key]["related"] = [{"title": n["title"], "url": n["url"]} for n in neighbours]
+
+
+def _current_etag(path):
+    """ETag of the snapshot already on disk, if any"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("etag")
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, data):
+    """Replace a file in one step so readers never see a partial snapshot"""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_snapshot(snapshot, out_dir=SNAPSHOT_DIR):
+    """
+    Write feed.json, feed.json.gz and (with brotli installed) feed.json.br
+
+    Nothing is rewritten when the ETag matches the snapshot on disk, so file
+    mtimes (and the static server's validators) only change with the feed.
+
+    Returns:
+        bool: True if files were written
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / SNAPSHOT_NAME
+
+    if _current_etag(path) == snapshot["etag"]:
+        return False
+
+    data = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode()
+
+    # Compressed variants first, plain JSON last: the plain file's ETag is
+    # what the next run compares against
+    _write_atomic(path.with_name(path.name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(path.with_name(path.name + ".br"), brotli.compress(data, mode=brotli.MODE_TEXT, quality=11))
+    _write_atomic(path, data)
+    return True
+
+
+def publish(base_url=None, api_key=None, out_dir=SNAPSHOT_DIR):
+    """
+    Build and write the snapshot, logging instead of raising on failure
+    (the dashboard falls back to querying Supabase directly)
+
+    Returns:
+        dict or None: The snapshot, or None if it couldn't be built
+    """
+    base_url = base_url or os.getenv("SUPABASE_URL")
+    api_key = api_key or os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    if not base_url or not api_key:
+        print("⚠️  Snapshot skipped: missing SUPABASE_URL or API key")
+        return None
+
+    try:
+        snapshot = build_snapshot(base_url, api_key)
+        written = write_snapshot(snapshot, out_dir)
+    except Exception as e:
+        print(f"❌ Failed to publish snapshot: {e}")
+        return None
+
+    enrichments = sum(len(a["enrichments"]) for a in snapshot["articles"])
+    if written:
+        print(f"📦 Snapshot published: {len(snapshot['articles'])} articles, {enrichments} enrichments (etag {snapshot['etag'][:12]})")
+    else:
+        print(f"📦 Snapshot unchanged (etag {snapshot['etag'][:12]})")
+    return snapshot
+
+
+if __name__ == "__main__":
+    publish()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Read API
+Small caching HTTP service for the dashboard: serves the feed from memory
+with ETag/304 revalidation, since= delta cursors and paged responses, and
+the dashboard's static files, so Supabase load doesn't grow with traffic
+
+    python tools/read_api.py [port]
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import secrets
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+
+# Touched by the save path; a newer marker means the cached feed is stale
+VERSION_FILE = STATE_DIR / "feed_version"
+
+SITE_DIR = Path(__file__).parent.parent
+DEFAULT_PORT = int(os.getenv("SCRAPER_API_PORT", "8000"))
+
+# Only the dashboard is served statically (never .env, tools/ or .tmp/)
+STATIC_FILES = {"/", "/index.html", "/app.js", "/styles.css"}
+STATIC_PREFIXES = ("/data/", "/DesignGuidelines/")
+
+# Articles per response: ?limit= defaults to, and is capped at, these
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# The feed is also reloaded after this many seconds, which picks
+# up deletions made from the dashboard and moves the 24h window
+CACHE_MAX_AGE = int(os.getenv("SCRAPER_API_CACHE_MAX_AGE", "300"))
+
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+
+
+def invalidate():
+    """Mark the cached feed stale; called once a save run has finished"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    VERSION_FILE.write_text(str(time.time()))
+
+
+def _version():
+    try:
+        return VERSION_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def _hash(value):
+    return hashlib.sha256(json.dumps(value, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def _sort_key(article):
+    """Feed order is newest first; id breaks ties so page cursors are stable"""
+    return (article.get("published_date") or "", article["id"])
+
+
+def _encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (str(key[0]), str(key[1]))
+    except (ValueError, TypeError, IndexError):
+        raise ValueError("invalid cursor")
+
+
+def _load_from_supabase():
+    """Default feed loader: the same document publish_snapshot writes"""
+    from publish_snapshot import build_snapshot
+
+    base_url = os.getenv("SUPABASE_URL")
+    api_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    if not base_url or not api_key:
+        raise RuntimeError("Missing SUPABASE_URL or API key")
+    return build_snapshot(base_url, api_key)
+
+
+class FeedCache:
+    """
+    In-memory feed with change tracking for delta reads
+
+    Every reload that changes the feed bumps a sequence number; each article
+    remembers the sequence it last changed at, and dropped articles leave a
+    tombstone. A since= cursor is "<epoch>.<seq>", where the epoch is random
+    per process, so a cursor from before a restart gets a full response.
+    """
+
+    def __init__(self, load=_load_from_supabase, max_age=CACHE_MAX_AGE):
+        self._load = load
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self.state = None
+        self._hashes = {}
+        self._changed = {}  # article id -> seq it last changed at
+        self._removed = {}  # article id -> seq it was dropped at
+        self._version = None
+        self._checked_at = 0.0
+
+    def current(self):
+        """The current state, reloading first if it is stale"""
+        version = _version()
+        with self._lock:
+            if self.state is None or version != self._version or time.monotonic() - self._checked_at > self.max_age:
+                try:
+                    self._reload(version)
+                except Exception as e:
+                    if self.state is None:
+                        raise
+                    # Keep serving the last good feed; retry after max_age
+                    print(f"⚠️  Feed reload failed, serving cached feed: {e}")
+                    self._version, self._checked_at = version, time.monotonic()
+            return self.state
+
+    def _reload(self, version):
+        snapshot = self._load()
+        self._version, self._checked_at = version, time.monotonic()
+
+        if self.state is not None and snapshot["etag"] == self.state["etag"]:
+            return
+
+        self.seq += 1
+        hashes = {a["id"]: _hash(a) for a in snapshot["articles"]}
+        for article_id, digest in hashes.items():
+            if self._hashes.get(article_id) != digest:
+                self._changed[article_id] = self.seq
+            self._removed.pop(article_id, None)
+        for article_id in self._hashes.keys() - hashes.keys():
+            self._removed[article_id] = self.seq
+            self._changed.pop(article_id, None)
+        self._hashes = hashes
+
+        self.state = {
+            "etag": snapshot["etag"],
+            "generated_at": snapshot["generated_at"],
+            "cursor": f"{self.epoch}.{self.seq}",
+            "articles": sorted(snapshot["articles"], key=_sort_key, reverse=True),
+            "changed": dict(self._changed),
+            "removed": dict(self._removed),
+        }
+        print(f"🔄 Feed loaded: {len(snapshot['articles'])} articles (version {self.seq})")
+
+    def page(self, since=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        One response's worth of the feed
+
+        Args:
+            since: Delta cursor from a previous response's "since"; only
+                articles changed after it (and ids removed after it) are returned
+            cursor: Page cursor from a previous response's "next_cursor"
+            limit: Maximum articles in this page
+
+        Returns:
+            dict: {"etag", "generated_at", "since", "full", "articles",
+                "removed", "next_cursor"}
+        """
+        state = self.current()
+
+        articles = state["articles"]
+        removed = []
+        full = True
+        if since:
+            epoch, _, seq = since.partition(".")
+            if epoch == self.epoch and seq.isdigit():
+                full = False
+                seq = int(seq)
+                articles = [a for a in articles if state["changed"].get(a["id"], 0) > seq]
+                removed = [i for i, at in state["removed"].items() if at > seq]
+
+        if cursor:
+            after = _decode_cursor(cursor)
+            articles = [a for a in articles if _sort_key(a) < after]
+
+        page = articles[:limit]
+        return {
+            "etag": state["etag"],
+            "generated_at": state["generated_at"],
+            "since": state["cursor"],
+            "full": full,
+            "articles": page,
+            # Removals are reported once, with the first page
+            "removed": [] if cursor else removed,
+            "next_cursor": _encode_cursor(_sort_key(page[-1])) if len(articles) > limit else None,
+        }
+
+
+class ReadAPIHandler(SimpleHTTPRequestHandler):
+    """GET /api/feed from the cache; the dashboard's own files from disk"""
+
+    cache = None  # FeedCache, set by serve()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(SITE_DIR), **kwargs)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/api/feed":
+            self._feed(parse_qs(url.query))
+        elif self._is_static(url.path):
+            super().do_GET()
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_HEAD(self):
+        if self._is_static(urlsplit(self.path).path):
+            super().do_HEAD()
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    @staticmethod
+    def _is_static(path):
+        # Normalized the way translate_path will, so ../ can't escape the allow-list
+        path = posixpath.normpath(unquote(path))
+        if path != "/" and path.endswith("/"):
+            path = path.rstrip("/")
+        return path in STATIC_FILES or path.startswith(STATIC_PREFIXES)
+
+    def _feed(self, query):
+        try:
+            limit = int(query.get("limit", [DEFAULT_PAGE_SIZE])[0])
+            if limit < 1:
+                raise ValueError("limit must be positive")
+            response = self.cache.page(
+                since=query.get("since", [None])[0],
+                cursor=query.get("cursor", [None])[0],
+                limit=min(limit, MAX_PAGE_SIZE),
+            )
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"feed unavailable: {e}"})
+            return
+
+        # The body is fully determined by the feed contents and the query
+        etag = '"' + hashlib.sha256(f"{response['etag']}|{response['since']}|{sorted(query.items())}".encode()).hexdigest()[:32] + '"'
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        self._send_json(HTTPStatus.OK, response, {"ETag": etag, "Cache-Control": "no-cache"})
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Vary", "Accept-Encoding")
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header("Content-Encoding", "gzip")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Only log problems; 200s and 304s are the normal case
+        if len(args) > 1 and str(args[1]).startswith(("4", "5")):
+            super().log_message(format, *args)
+
+
+def serve(port=DEFAULT_PORT, cache=None):
+    """Serve the dashboard and its feed API until interrupted"""
+    ReadAPIHandler.cache = cache or FeedCache()
+    server = ThreadingHTTPServer(("", port), ReadAPIHandler)
+    print(f"🌐 Dashboard and read API on http://localhost:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT)
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Related Index
+Precomputed "related coverage" for articles and enrichments: every item is
+a hashed TF-IDF vector in an on-disk matrix, and its top-k cosine
+neighbours among items from earlier days are stored ahead of time, so the
+dashboard looks them up instead of scanning every row.
+
+    python tools/related_index.py --rebuild
+    python tools/related_index.py --bench 100000
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+DB_FILE = STATE_DIR / "related_index.sqlite3"
+VECTORS_FILE = STATE_DIR / "related_vectors.f16"
+DF_FILE = STATE_DIR / "related_df.npy"
+
+# Terms hash into TERM_BUCKETS for document frequencies, and each bucket
+# folds into one of DIM signed vector components
+TERM_BUCKETS = 1 << 20
+DIM = 1024
+
+# Neighbours kept per item, and the lowest cosine worth keeping
+TOP_K = 10
+MIN_SIMILARITY = 0.15
+
+# Rows per block in the matrix products: memory is O(BLOCK_ROWS^2 + BLOCK_ROWS * DIM)
+# however many items there are
+BLOCK_ROWS = 2048
+
+# Only the start of long enrichment content is used
+MAX_WORDS = 200
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their "
+    "this to was were will with you your we our they he she his her not but so if than then".split()
+)
+
+
+@contextmanager
+def _db():
+    """Open the index for one operation, committing on success"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    try:
+        _init(conn)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    # row is the item's row in the vector matrix
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            row INTEGER PRIMARY KEY,
+            key TEXT UNIQUE NOT NULL,
+            day INTEGER NOT NULL,
+            title TEXT,
+            url TEXT,
+            pending INTEGER NOT NULL DEFAULT 1,
+            digest TEXT
+        )
+        """
+    )
+    # Indexes built before items had a digest
+    if "digest" not in {column[1] for column in conn.execute("PRAGMA table_info(items)")}:
+        conn.execute("ALTER TABLE items ADD COLUMN digest TEXT")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS neighbours (
+            key TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbour_row INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (key, rank)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS neighbours_row ON neighbours (neighbour_row)")
+
+
+def _terms(text):
+    """Hashes (crc32) of the unigrams and bigrams of a text"""
+    words = [w for w in _TOKEN.findall((text or "").lower()) if w not in _STOPWORDS][:MAX_WORDS]
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return np.array([zlib.crc32(t.encode()) for t in terms], dtype=np.uint32)
+
+
+def _day(published_date):
+    """Day number of an ISO timestamp (today if missing or unparseable)"""
+    try:
+        return datetime.fromisoformat(str(published_date).replace("Z", "+00:00")).date().toordinal()
+    except ValueError:
+        return date.today().toordinal()
+
+
+def _load_df():
+    """Document frequency per term bucket, and the number of documents counted"""
+    try:
+        df = np.load(DF_FILE)
+    except (FileNotFoundError, ValueError):
+        df = np.zeros(TERM_BUCKETS + 1, dtype=np.int32)
+    return df[:-1], int(df[-1])
+
+
+def _save_df(df, docs):
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = DF_FILE.with_name(DF_FILE.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, np.append(df, np.int32(docs)))
+    os.replace(tmp, DF_FILE)
+
+
+def _count_terms(df, term_lists):
+    """Add each text's distinct term buckets to the document frequencies"""
+    for terms in term_lists:
+        np.add.at(df, np.unique(terms % TERM_BUCKETS), 1)
+
+
+def _vectorize(term_lists, df, docs):
+    """
+    Unit-length TF-IDF vectors, hashed down to DIM signed components
+
+    Returns:
+        numpy.ndarray: len(term_lists) x DIM float32
+    """
+    vectors = np.zeros((len(term_lists), DIM), dtype=np.float32)
+    for i, terms in enumerate(term_lists):
+        if not len(terms):
+            continue
+        hashes, counts = np.unique(terms, return_counts=True)
+        buckets = hashes % TERM_BUCKETS
+        idf = np.log((1 + docs) / (1 + df[buckets])) + 1
+        signs = np.where(hashes >> 31, -1.0, 1.0)
+        np.add.at(vectors[i], buckets % DIM, signs * (1 + np.log(counts)) * idf)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def _open_vectors(rows, mode="r"):
+    return np.memmap(VECTORS_FILE, dtype=np.float16, mode=mode, shape=(rows, DIM))
+
+
+def _row_count(conn):
+    return conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM items").fetchone()[0]
+
+
+def _digest(text, day):
+    return hashlib.sha256(f"{day}\n{text}".encode()).hexdigest()
+
+
+def add(items, update_df=True):
+    """
+    Add or update items; their neighbours are computed by refresh()
+
+    Only keys not indexed before are counted into the document frequencies,
+    so re-saving an item doesn't inflate them (the terms of a changed text
+    stay counted as they first were). An item whose text or day changed is
+    re-vectorized, and the items listing it as a neighbour are marked
+    pending so refresh() recomputes their scores.
+
+    Args:
+        items: Dicts with "key", "text", "published_date", "title" and "url"
+        update_df: Count new items into the document frequencies first
+
+    Returns:
+        int: Items added or changed
+    """
+    # One entry per key (the last one wins), so each maps to a single row
+    items = list({item["key"]: item for item in items}.values())
+    if not items:
+        return 0
+
+    with _db() as conn:
+        n = next_row = _row_count(conn)
+
+        changed, existing, rows = [], [], []
+        for item in items:
+            day = _day(item.get("published_date"))
+            digest = _digest(item["text"], day)
+            stored = conn.execute("SELECT row, digest FROM items WHERE key = ?", (item["key"],)).fetchone()
+            if stored and stored[1] == digest:
+                conn.execute(
+                    "UPDATE items SET title = ?, url = ? WHERE row = ?",
+                    (item.get("title"), item.get("url"), stored[0]),
+                )
+                continue
+
+            if stored:
+                row = stored[0]
+                existing.append(row)
+            else:
+                row, next_row = next_row, next_row + 1
+            changed.append(item)
+            rows.append(row)
+            conn.execute(
+                "INSERT INTO items (row, key, day, title, url, pending, digest) VALUES (?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT(key) DO UPDATE SET day = excluded.day, title = excluded.title, url = excluded.url, "
+                "pending = 1, digest = excluded.digest",
+                (row, item["key"], day, item.get("title"), item.get("url"), digest),
+            )
+        if not changed:
+            return 0
+
+        # Stored scores against a changed item are stale
+        for row in existing:
+            conn.execute(
+                "UPDATE items SET pending = 1 WHERE key IN (SELECT key FROM neighbours WHERE neighbour_row = ?)",
+                (row,),
+            )
+
+        term_lists = [_terms(item["text"]) for item in changed]
+        df, docs = _load_df()
+        rows = np.array(rows)
+        appended = rows >= n
+        if update_df and appended.any():
+            _count_terms(df, [terms for terms, new in zip(term_lists, appended) if new])
+            docs += int(appended.sum())
+            _save_df(df, docs)
+        vectors = _vectorize(term_lists, df, docs).astype(np.float16)
+
+        # New rows are appended to the matrix, updated ones overwritten in place
+        if appended.any():
+            order = np.argsort(rows[appended])
+            with open(VECTORS_FILE, "ab") as f:
+                # Drop anything past row n left by a write whose commit failed
+                f.truncate(n * DIM * np.dtype(np.float16).itemsize)
+                f.write(vectors[appended][order].tobytes())
+        if (~appended).any():
+            matrix = _open_vectors(n, mode="r+")
+            matrix[rows[~appended]] = vectors[~appended]
+            matrix.flush()
+            del matrix
+
+    return len(changed)
+
+
+def _top_k(matrix, days, query_rows, k=TOP_K, block_rows=BLOCK_ROWS):
+    """
+    Top-k earlier-day neighbours of some rows, by blocked matrix products
+
+    Yields:
+        tuple: (query row, neighbour rows, scores), best first
+    """
+    n = len(days)
+    for qs in range(0, len(query_rows), block_rows):
+        rows = query_rows[qs:qs + block_rows]
+        queries = np.asarray(matrix[rows], dtype=np.float32)
+        query_days = days[rows]
+        best_scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(rows), k), -1, dtype=np.int64)
+
+        for cs in range(0, n, block_rows):
+            candidate_days = days[cs:cs + block_rows]
+            if candidate_days.min() >= query_days.max():
+                continue  # nothing in this block is older than any query
+            scores = queries @ np.asarray(matrix[cs:cs + block_rows], dtype=np.float32).T
+            scores[candidate_days[None, :] >= query_days[:, None]] = -np.inf
+
+            # Merge with the running top-k: argpartition, not a full sort
+            scores = np.hstack([best_scores, scores])
+            candidates = np.hstack([best_rows, np.broadcast_to(np.arange(cs, cs + len(candidate_days)), (len(rows), len(candidate_days)))])
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+            best_rows = np.take_along_axis(candidates, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        for row, neighbours, scores in zip(rows, best_rows, best_scores):
+            found = (neighbours >= 0) & (scores >= MIN_SIMILARITY)
+            yield int(row), neighbours[found], scores[found]
+
+
+def refresh(all_rows=False):
+    """
+    Compute and store neighbours for items added or changed since the last
+    refresh (or for every item)
+
+    Neighbours are always from earlier days, so a new item never changes
+    the lists of items already stored; only pending rows need computing.
+    An item whose text changed is rescored for the items that listed it
+    (add() marks them pending), but items that didn't list it before only
+    pick it up with all_rows=True or a rebuild.
+
+    Returns:
+        int: Items whose neighbours were computed
+    """
+    with _db() as conn:
+        n = _row_count(conn)
+        if n == 0:
+            return 0
+        days = np.zeros(n, dtype=np.int64)
+        keys = {}
+        for row, key, day in conn.execute("SELECT row, key, day FROM items"):
+            days[row] = day
+            keys[row] = key
+        where = "" if all_rows else " WHERE pending = 1"
+        pending = np.array([r[0] for r in conn.execute(f"SELECT row FROM items{where} ORDER BY row")], dtype=np.int64)
+    if not len(pending):
+        return 0
+
+    matrix = _open_vectors(n)
+    with _db() as conn:
+        for row, neighbours, scores in _top_k(matrix, days, pending):
+            key = keys[row]
+            conn.execute("DELETE FROM neighbours WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO neighbours (key, rank, neighbour_row, score) VALUES (?, ?, ?, ?)",
+                [(key, rank, int(r), float(s)) for rank, (r, s) in enumerate(zip(neighbours, scores))],
+            )
+            conn.execute("UPDATE items SET pending = 0 WHERE row = ?", (row,))
+    del matrix
+    return len(pending)
+
+
+def related(keys, limit=TOP_K):
+    """
+    Stored neighbours of items
+
+    Args:
+        keys: Item keys ("a:<url>" or "e:<url>#<position>")
+        limit: Neighbours per item
+
+    Returns:
+        dict: key -> list of {"key", "title", "url", "score"}, best first
+    """
+    result = {}
+    with _db() as conn:
+        for key in keys:
+            rows = conn.execute(
+                "SELECT i.key, i.title, i.url, n.score FROM neighbours n JOIN items i ON i.row = n.neighbour_row "
+                "WHERE n.key = ? ORDER BY n.rank LIMIT ?",
+                (key, limit),
+            ).fetchall()
+            if rows:
+                result[key] = [{"key": k, "title": t, "url": u, "score": round(s, 3)} for k, t, u, s in rows]
+    return result
+
+
+def record_items(records):
+    """
+    Index items for scraped records, keyed like the search index
+
+    Args:
+        records: List of {"article": dict, "enrichments": list}
+
+    Returns:
+        list: Items for add()
+    """
+    items = []
+    for record in records:
+        article = record["article"]
+        url = article["url"]
+        published = article.get("published_date")
+        items.append({
+            "key": f"a:{url}", "url": url, "published_date": published,
+            "title": article.get("title"), "text": f"{article.get('title') or ''} {article.get('summary') or ''}",
+        })
+        for enrichment in record.get("enrichments") or []:
+            items.append({
+                "key": f"e:{url}#{enrichment.get('position', 0)}", "url": url, "published_date": published,
+                "title": enrichment.get("title"),
+                "text": " ".join(filter(None, (enrichment.get("title"), enrichment.get("summary"), enrichment.get("content")))),
+            })
+    return items
+
+
+def clear():
+    """Forget every item and neighbour"""
+    with _db() as conn:
+        conn.execute("DELETE FROM neighbours")
+        conn.execute("DELETE FROM items")
+    for path in (VECTORS_FILE, DF_FILE):
+        path.unlink(missing_ok=True)
+
+
+def _stream_items(base_url, api_key):
+    """Every article and enrichment in the database, as index items"""
+    import postgrest_reader
+
+    for article in postgrest_reader.iter_rows(base_url, api_key, "articles", "url,title,summary,published_date"):
+        yield from record_items([{"article": article}])
+    for enrichment in postgrest_reader.iter_rows(
+        base_url, api_key, "article_enrichments",
+        ["position", "title", "summary", "content", "articles(url,published_date)"],
+    ):
+        if enrichment.get("articles"):
+            yield from record_items([{"article": enrichment["articles"], "enrichments": [enrichment]}])[1:]
+
+
+def rebuild(items=None, chunk_size=5000):
+    """
+    Recreate the index: document frequencies from every item first, then
+    vectors, then all neighbours
+
+    Args:
+        items: Callable returning an iterable of items (defaults to
+            streaming both tables from Supabase, once per pass)
+
+    Returns:
+        int: Items indexed
+    """
+    if items is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        base_url = os.getenv("SUPABASE_URL")
+        api_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+        if not base_url or not api_key:
+            raise ValueError("Missing SUPABASE_URL or API key")
+        items = lambda: _stream_items(base_url, api_key)  # noqa: E731
+
+    clear()
+    df = np.zeros(TERM_BUCKETS, dtype=np.int32)
+    docs = 0
+    for item in items():
+        _count_terms(df, [_terms(item["text"])])
+        docs += 1
+    _save_df(df, docs)
+
+    chunk = []
+    for item in items():
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            add(chunk, update_df=False)
+            chunk = []
+    add(chunk, update_df=False)
+
+    refresh(all_rows=True)
+    return docs
+
+
+def _bench(count):
+    """Build an index of synthetic items and time it"""
+    vocabulary = np.array([f"w{i}" for i in range(20000)])
+    rng = np.random.RandomState(0)
+    start_day = date(2024, 1, 1).toordinal()
+
+    def items():
+        rng.seed(0)
+        for i in range(count):
+            day = date.fromordinal(start_day + i * 700 // count)
+            yield {
+                "key": f"e:bench{i}#0", "url": f"bench{i}", "title": f"Item {i}",
+                "published_date": day.isoformat(), "text": " ".join(rng.choice(vocabulary, 80)),
+            }
+
+    start = time.perf_counter()
+    rebuild(items)
+    elapsed = time.perf_counter() - start
+    size_mb = VECTORS_FILE.stat().st_size / 1024 / 1024
+    print(f"🔗 {count} items indexed with top-{TOP_K} neighbours in {elapsed:.1f}s ({size_mb:.0f} MB of vectors)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Related-stories index")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index everything from Supabase")
+    parser.add_argument("--bench", type=int, metavar="ITEMS", help="Build an index of synthetic items (replaces the index)")
+    parser.add_argument("key", nargs="?", help='Show the neighbours of one item ("e:<url>#<position>")')
+    args = parser.parse_args()
+
+    if args.bench:
+        _bench(args.bench)
+    elif args.rebuild:
+        start = time.perf_counter()
+        count = rebuild()
+        print(f"🔗 Related index rebuilt: {count} items in {time.perf_counter() - start:.1f}s")
+    elif args.key:
+        for neighbour in related([args.key]).get(args.key, []):
+            print(f"{neighbour['score']:.3f}  {neighbour['title']}  {neighbour['url']}")
+    else:
+        with _db() as conn:
+            items = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            pending = conn.execute("SELECT COUNT(*) FROM items WHERE pending = 1").fetchone()[0]
+        print(f"🔗 {items} indexed items, {pending} awaiting neighbours")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,31 @@ Saves scraped articles and enrichments to Supabase database
 """
 
 import os
+import hashlib
 import json
+import sqlite3
+from itertools import islice
 from pathlib import Path
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+import read_api
+import related_index
+import search_index
+import http_validators
+import story_clusters
+import tagger
+import source_cursor
+
 # Load environment variables
 load_dotenv()
 
+# Records saved per bulk round trip (one article upsert per batch)
+SAVE_BATCH_SIZE = 50
+
+# Enrichment rows sent per insert request
+ENRICHMENT_BATCH_SIZE = 500
+
 def get_supabase_client() -> Client:
     """Create and return Supabase client"""
     url = os.getenv("SUPABASE_URL")
@@ -23,9 +40,152 @@ def get_supabase_client() -> Client:
     
     return create_client(url, key)
 
+# Enrichment fields covered by content_hash; a row whose hash matches the
+# stored one is left untouched
+HASHED_ENRICHMENT_FIELDS = ("title", "summary", "image_url", "content", "tags", "story_id")
+
+# Hashed fields set by optional save stages (tagging, story clustering); a
+# row left without one by a failed stage keeps the stored value
+OPTIONAL_ENRICHMENT_FIELDS = ("tags", "story_id")
+
+def _content_hash(row: dict) -> str:
+    fingerprint = json.dumps([row.get(field) for field in HASHED_ENRICHMENT_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+def _enrichment_row(article_id: str, enrichment: dict, story_id: str = None) -> dict:
+    """
+    Map a scraped enrichment onto an article_enrichments row, with its content_hash
+    
+    tags and story_id are only set when the tagger and story clustering
+    provided them (see OPTIONAL_ENRICHMENT_FIELDS).
+    """
+    row = {
+        "article_id": article_id,
+        "title": enrichment["title"],
+        "summary": enrichment.get("summary", ""),
+        "image_url": enrichment.get("image_url"),
+        "content": enrichment.get("content", ""),
+        "position": enrichment.get("position", 0)
+    }
+    if "tags" in enrichment:
+        row["tags"] = enrichment["tags"] or []
+    if story_id:
+        row["story_id"] = story_id
+    row["content_hash"] = _content_hash(row)
+    return row
+
+def _empty_enrichment_stats() -> dict:
+    return {"success": 0, "unchanged": 0, "deleted": 0, "errors": 0}
+
+def _add_enrichment_stats(stats: dict, enrich_stats: dict):
+    for key, value in enrich_stats.items():
+        stats["enrichments"][key] = stats["enrichments"].get(key, 0) + value
+
+def upsert_enrichment_rows(supabase: Client, rows: list) -> dict:
+    """
+    Upsert enrichment rows on (article_id, position) in batches of
+    ENRICHMENT_BATCH_SIZE
+    
+    Existing rows are updated in place, so their ids (and users' saved
+    enrichments pointing at them) survive. A batch that fails is retried
+    row by row, so one bad row only costs itself and is reported on its own.
+    
+    Args:
+        supabase: Supabase client
+        rows: article_enrichments rows
+        
+    Returns:
+        dict: Statistics about the save operation
+    """
+    stats = {"success": 0, "errors": 0}
+    table = supabase.table("article_enrichments")
+    
+    for start in range(0, len(rows), ENRICHMENT_BATCH_SIZE):
+        batch = rows[start:start + ENRICHMENT_BATCH_SIZE]
+        try:
+            table.upsert(batch, on_conflict="article_id,position", returning="minimal").execute()
+            stats["success"] += len(batch)
+            continue
+        except Exception as e:
+            print(f"    ⚠️  Bulk upsert of {len(batch)} enrichments failed ({e}), retrying row by row")
+        
+        for row in batch:
+            try:
+                table.upsert(row, on_conflict="article_id,position", returning="minimal").execute()
+                stats["success"] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                print(f"    ❌ Error saving enrichment '{row['title'][:40]}': {e}")
+    
+    return stats
+
+def sync_enrichments(supabase: Client, rows_by_article: dict) -> dict:
+    """
+    Bring stored enrichments in line with freshly scraped ones, writing
+    only what changed
+    
+    Stored (position, content_hash) pairs for all given articles are read
+    in one request. Positions whose hash differs (or that are new) are
+    upserted, positions that disappeared are deleted, and everything else
+    is left alone, so re-saving an unchanged issue makes no writes.
+    
+    Args:
+        supabase: Supabase client
+        rows_by_article: Dict mapping article id to its new enrichment rows
+        
+    Returns:
+        dict: Statistics (success, unchanged, deleted, errors)
+    """
+    stats = _empty_enrichment_stats()
+    if not rows_by_article:
+        return stats
+    
+    try:
+        response = supabase.table("article_enrichments").select(
+            ",".join(["id", "article_id", "position", "content_hash", *OPTIONAL_ENRICHMENT_FIELDS])
+        ).in_("article_id", list(rows_by_article)).execute()
+        stored = response.data or []
+    except Exception as e:
+        print(f"    ⚠️  Could not read stored enrichments ({e}), rewriting all positions")
+        stored = []
+    
+    stored_by_key = {(row["article_id"], row["position"]): row for row in stored}
+    changed = []
+    kept = set()
+    for article_id, rows in rows_by_article.items():
+        for row in rows:
+            key = (article_id, row["position"])
+            kept.add(key)
+            previous = stored_by_key.get(key, {})
+            # Fields a failed optional stage didn't set keep their stored values
+            missing = [f for f in OPTIONAL_ENRICHMENT_FIELDS if f not in row and previous.get(f) is not None]
+            if missing:
+                row.update({f: previous[f] for f in missing})
+                row["content_hash"] = _content_hash(row)
+            if previous.get("content_hash") == row["content_hash"]:
+                stats["unchanged"] += 1
+            else:
+                changed.append(row)
+    
+    removed = [row["id"] for row in stored if (row["article_id"], row["position"]) not in kept]
+    if removed:
+        try:
+            supabase.table("article_enrichments").delete(returning="minimal").in_("id", removed).execute()
+            stats["deleted"] += len(removed)
+        except Exception as e:
+            stats["errors"] += len(removed)
+            print(f"    ❌ Could not delete {len(removed)} removed enrichments: {e}")
+    
+    if changed:
+        upsert_stats = upsert_enrichment_rows(supabase, changed)
+        stats["success"] += upsert_stats["success"]
+        stats["errors"] += upsert_stats["errors"]
+    
+    return stats
+
 def save_enrichments(supabase: Client, article_id: str, enrichments: list) -> dict:
     """
-    Save article enrichments to Supabase
+    Save article enrichments to Supabase, writing only changed positions
     
     Args:
         supabase: Supabase client
@@ -36,35 +196,296 @@ def save_enrichments(supabase: Client, article_id: str, enrichments: list) -> di
         dict: Statistics about the save operation
     """
     if not enrichments:
-        return {"success": 0, "errors": 0}
+        return _empty_enrichment_stats()
     
-    stats = {"success": 0, "errors": 0}
+    rows = [_enrichment_row(article_id, enrichment) for enrichment in enrichments]
+    return sync_enrichments(supabase, {article_id: rows})
+
+def _index_quietly(records: list):
+    """Search index update that never fails a save"""
+    if not records:
+        return
+    try:
+        search_index.index_records(records)
+    except (OSError, sqlite3.Error) as e:
+        print(f"    ⚠️  Could not update search index: {e}")
+
+def _relate_quietly(records: list):
+    """Add saved items to the related-stories index without failing the save"""
+    if not records:
+        return
+    try:
+        related_index.add(related_index.record_items(records))
+    except (OSError, sqlite3.Error) as e:
+        print(f"    ⚠️  Could not update related index: {e}")
+
+def _tag_quietly(records: list):
+    """Topic tags for a batch; tags are optional, so a failure never fails the save"""
+    try:
+        tagger.tag_records(records)
+    except Exception as e:
+        print(f"  ⚠️  Could not tag batch: {e}")
+
+def _assign_stories_quietly(records: list) -> tuple:
+    """Story ids for a batch's articles and enrichments; none if clustering fails"""
+    try:
+        return story_clusters.assign(story_clusters.record_items(records))
+    except (OSError, sqlite3.Error) as e:
+        print(f"  ⚠️  Could not assign stories: {e}")
+        return {}, {}
+
+def merge_stories(supabase: Client, merged: dict):
+    """Relabel stored rows of stories that were absorbed into another one"""
+    by_target = {}
+    for absorbed, story in merged.items():
+        by_target.setdefault(story, []).append(absorbed)
+    
+    for story, absorbed in by_target.items():
+        for table in ("articles", "article_enrichments"):
+            try:
+                supabase.table(table).update({"story_id": story}, returning="minimal").in_("story_id", absorbed).execute()
+            except Exception as e:
+                print(f"    ⚠️  Could not merge {len(absorbed)} stories in {table}: {e}")
+
+def save_record(supabase: Client, article: dict, enrichments: list, stats: dict) -> bool:
+    """
+    Upsert one article and sync its enrichments
     
-    # Delete existing enrichments for this article first
+    Args:
+        supabase: Supabase client
+        article: Article dictionary
+        enrichments: List of enrichment dictionaries for this article
+        stats: Statistics dict (as returned by save_records) to update
+        
+    Returns:
+        bool: True if the article was saved
+    """
     try:
-        supabase.table("article_enrichments").delete().eq("article_id", article_id).execute()
+        # Remove enrichment_count from article data (not in schema)
+        article_data = {k: v for k, v in article.items() if k != "enrichment_count"}
+        
+        # Upsert article (insert or update if URL exists)
+        response = supabase.table("articles").upsert(
+            article_data,
+            on_conflict="url"
+        ).execute()
+        
+        if not response.data:
+            stats["articles"]["skipped"] += 1
+            print(f"  ⏭️  Skipped (duplicate): {article['title'][:60]}...")
+            return False
+        
+        article_id = response.data[0]["id"]
+        stats["articles"]["success"] += 1
+        print(f"  ✅ Saved: {article['title'][:60]}...")
+        
+        # Save enrichments if available
+        if enrichments:
+            print(f"    🔍 Saving {len(enrichments)} enrichments...")
+            enrich_stats = save_enrichments(supabase, article_id, enrichments)
+            _add_enrichment_stats(stats, enrich_stats)
+            print(f"    ✅ Saved {enrich_stats['success']} enrichments ({enrich_stats['unchanged']} unchanged)")
+        
+        return True
+        
     except Exception as e:
-        print(f"    ⚠️  Warning: Could not delete old enrichments: {e}")
+        stats["articles"]["errors"] += 1
+        print(f"  ❌ Error saving article: {e}")
+        return False
+
+def save_batch(supabase: Client, records: list, stats: dict) -> list:
+    """
+    Save a batch of records with a constant number of round trips
     
-    # Insert new enrichments
-    for enrichment in enrichments:
-        try:
-            enrichment_data = {
-                "article_id": article_id,
-                "title": enrichment["title"],
-                "summary": enrichment.get("summary", ""),
-                "image_url": enrichment.get("image_url"),
-                "content": enrichment.get("content", ""),
-                "position": enrichment.get("position", 0)
-            }
-            
-            supabase.table("article_enrichments").insert(enrichment_data).execute()
-            stats["success"] += 1
-            
-        except Exception as e:
-            stats["errors"] += 1
-            print(f"    ❌ Error saving enrichment: {e}")
+    All articles go in one upsert (on_conflict url) whose returned rows map
+    ids back by URL, then all their enrichments are synced by content hash
+    together. If the bulk upsert fails, the batch falls back to save_record
+    for each record so errors are still reported per article.
+    
+    Args:
+        supabase: Supabase client
+        records: List of {"article": dict, "enrichments": list}
+        stats: Statistics dict (as returned by save_records) to update
+        
+    Returns:
+        list: Articles that were saved
+    """
+    # One row per URL: an upsert can't touch the same row twice
+    by_url = {}
+    for record in records:
+        by_url[record["article"]["url"]] = record
+    records = list(by_url.values())
+    
+    # Topic tags for the whole batch in one vectorized pass
+    _tag_quietly(records)
+    
+    # Near-duplicates across sources share a story_id
+    story_ids, merged_stories = _assign_stories_quietly(records)
+    
+    # Remove enrichment_count from article data (not in schema)
+    article_rows = [
+        {k: v for k, v in record["article"].items() if k != "enrichment_count"}
+        for record in records
+    ]
+    for row in article_rows:
+        if f"a:{row['url']}" in story_ids:
+            row["story_id"] = story_ids[f"a:{row['url']}"]
+    
+    try:
+        response = supabase.table("articles").upsert(article_rows, on_conflict="url").execute()
+        ids = {row["url"]: row["id"] for row in response.data or []}
+    except Exception as e:
+        print(f"  ⚠️  Bulk upsert of {len(records)} articles failed ({e}), saving one by one")
+        saved_records = [
+            record for record in records
+            if save_record(supabase, record["article"], record.get("enrichments") or [], stats)
+        ]
+        _index_quietly(saved_records)
+        _relate_quietly(saved_records)
+        return [record["article"] for record in saved_records]
+    
+    saved = []
+    indexed = []
+    enrichment_rows = {}
+    for record in records:
+        article = record["article"]
+        article_id = ids.get(article["url"])
+        if not article_id:
+            stats["articles"]["skipped"] += 1
+            print(f"  ⏭️  Skipped (duplicate): {article['title'][:60]}...")
+            continue
+        
+        stats["articles"]["success"] += 1
+        saved.append(article)
+        indexed.append({"article": dict(article, id=article_id), "enrichments": record.get("enrichments")})
+        print(f"  ✅ Saved: {article['title'][:60]}...")
+        # Articles scraped without enrichments keep the ones already stored
+        if record.get("enrichments"):
+            enrichment_rows[article_id] = [
+                _enrichment_row(article_id, e, story_ids.get(f"e:{article['url']}#{e.get('position', 0)}"))
+                for e in record["enrichments"]
+            ]
+    
+    if enrichment_rows:
+        total = sum(len(rows) for rows in enrichment_rows.values())
+        print(f"    🔍 Syncing {total} enrichments...")
+        enrich_stats = sync_enrichments(supabase, enrichment_rows)
+        _add_enrichment_stats(stats, enrich_stats)
+        print(
+            f"    ✅ Saved {enrich_stats['success']} enrichments "
+            f"({enrich_stats['unchanged']} unchanged, {enrich_stats['deleted']} removed)"
+        )
+    
+    if merged_stories:
+        merge_stories(supabase, merged_stories)
+    
+    _index_quietly(indexed)
+    _relate_quietly(indexed)
+    return saved
+
+def _batched(records, batch_size: int):
+    """Group a record stream into lists of up to batch_size"""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def save_records(records, batch_size: int = SAVE_BATCH_SIZE) -> dict:
+    """
+    Save a stream of scraped records to Supabase in bulk batches
+    
+    Args:
+        records: Iterable of {"article": dict, "enrichments": list}
+        batch_size: Records per bulk round trip
+        
+    Returns:
+        dict: Statistics about the save operation
+    """
+    return save_batches(_batched(records, batch_size))
+
+def save_batches(batches) -> dict:
+    """
+    Save a stream of record batches to Supabase as they arrive
+    
+    Batches are consumed one at a time, so this can run as the writer stage
+    of a pipeline while scrapers are still fetching. A source's HTTP
+    validators record is remembered at the end only if none of that
+    source's records failed to save.
+    
+    Args:
+        batches: Iterable of lists of {"article": dict, "enrichments": list}
+            records, and {"source", "validators"} records from scrapers
+        
+    Returns:
+        dict: Statistics about the save operation
+    """
+    stats = {
+        "articles": {"success": 0, "skipped": 0, "errors": 0},
+        "enrichments": _empty_enrichment_stats()
+    }
+    saved_articles = []
+    validators = []
+    failed_sources = set()
+    
+    try:
+        supabase = get_supabase_client()
+    except Exception as e:
+        print(f"❌ Fatal error connecting to Supabase: {e}")
+        for batch in batches:
+            stats["articles"]["errors"] += sum("article" in record for record in batch)
+        return stats
+    
+    for batch in batches:
+        validators.extend(record for record in batch if "validators" in record)
+        records = [record for record in batch if "article" in record]
+        if not records:
             continue
+        
+        enrichment_errors = stats["enrichments"]["errors"]
+        saved_urls = set()
+        for article in save_batch(supabase, records, stats):
+            saved_urls.add(article.get("url"))
+            # Only the cursor fields are kept, not the whole record
+            saved_articles.append({
+                "source": article.get("source"),
+                "url": article.get("url"),
+                "published_date": article.get("published_date")
+            })
+        
+        # Enrichment errors aren't tracked per article, so they fail every source in the batch
+        for record in records:
+            if record["article"]["url"] not in saved_urls or stats["enrichments"]["errors"] > enrichment_errors:
+                failed_sources.add(record["article"].get("source"))
+    
+    # Advance per-source cursors so the next run skips these articles
+    source_cursor.record(saved_articles)
+    
+    # Sources saved in full may get a 304 next run; the rest are fetched again
+    http_validators.remember([
+        record["validators"] for record in validators if record["source"] not in failed_sources
+    ])
+    
+    # Neighbours for everything added this run, in one blocked pass
+    try:
+        related_index.refresh()
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  Could not refresh related stories: {e}")
+    
+    # A running read API reloads the feed on its next request
+    read_api.invalidate()
+    
+    print("\n📊 Save Statistics:")
+    print("  Articles:")
+    print(f"    ✅ Success: {stats['articles']['success']}")
+    print(f"    ⏭️  Skipped: {stats['articles']['skipped']}")
+    print(f"    ❌ Errors: {stats['articles']['errors']}")
+    print("  Enrichments:")
+    print(f"    ✅ Success: {stats['enrichments']['success']}")
+    print(f"    💤 Unchanged: {stats['enrichments']['unchanged']}")
+    print(f"    🗑️  Removed: {stats['enrichments']['deleted']}")
+    print(f"    ❌ Errors: {stats['enrichments']['errors']}")
     
     return stats
 
@@ -81,69 +502,15 @@ def save_articles_with_enrichments(articles: list, enrichments_map: dict = None)
     """
     if not articles:
         print("⚠️  No articles to save")
-        return {"articles": {"success": 0, "skipped": 0, "errors": 0}, "enrichments": {"success": 0, "errors": 0}}
+        return {"articles": {"success": 0, "skipped": 0, "errors": 0}, "enrichments": _empty_enrichment_stats()}
     
     print(f"💾 Saving {len(articles)} articles to Supabase...")
     
-    try:
-        supabase = get_supabase_client()
-        
-        stats = {
-            "articles": {"success": 0, "skipped": 0, "errors": 0},
-            "enrichments": {"success": 0, "errors": 0}
-        }
-        
-        for article in articles:
-            try:
-                # Remove enrichment_count from article data (not in schema)
-                article_data = {k: v for k, v in article.items() if k != "enrichment_count"}
-                
-                # Upsert article (insert or update if URL exists)
-                response = supabase.table("articles").upsert(
-                    article_data,
-                    on_conflict="url"
-                ).execute()
-                
-                if response.data and len(response.data) > 0:
-                    article_id = response.data[0]["id"]
-                    stats["articles"]["success"] += 1
-                    print(f"  ✅ Saved: {article['title'][:60]}...")
-                    
-                    # Save enrichments if available
-                    if enrichments_map and article["url"] in enrichments_map:
-                        enrichments = enrichments_map[article["url"]]
-                        if enrichments:
-                            print(f"    🔍 Saving {len(enrichments)} enrichments...")
-                            enrich_stats = save_enrichments(supabase, article_id, enrichments)
-                            stats["enrichments"]["success"] += enrich_stats["success"]
-                            stats["enrichments"]["errors"] += enrich_stats["errors"]
-                            print(f"    ✅ Saved {enrich_stats['success']} enrichments")
-                else:
-                    stats["articles"]["skipped"] += 1
-                    print(f"  ⏭️  Skipped (duplicate): {article['title'][:60]}...")
-                    
-            except Exception as e:
-                stats["articles"]["errors"] += 1
-                print(f"  ❌ Error saving article: {e}")
-                continue
-        
-        print(f"\n📊 Save Statistics:")
-        print(f"  Articles:")
-        print(f"    ✅ Success: {stats['articles']['success']}")
-        print(f"    ⏭️  Skipped: {stats['articles']['skipped']}")
-        print(f"    ❌ Errors: {stats['articles']['errors']}")
-        print(f"  Enrichments:")
-        print(f"    ✅ Success: {stats['enrichments']['success']}")
-        print(f"    ❌ Errors: {stats['enrichments']['errors']}")
-        
-        return stats
-        
-    except Exception as e:
-        print(f"❌ Fatal error connecting to Supabase: {e}")
-        return {
-            "articles": {"success": 0, "skipped": 0, "errors": len(articles)},
-            "enrichments": {"success": 0, "errors": 0}
-        }
+    enrichments_map = enrichments_map or {}
+    return save_records(
+        {"article": article, "enrichments": enrichments_map.get(article["url"], [])}
+        for article in articles
+    )
 
 def load_data_from_tmp() -> tuple:
     """Load articles and enrichments from .tmp directory for testing"""
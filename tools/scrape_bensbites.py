@@ -6,10 +6,13 @@ Scrapes latest AI news from Ben's Bites using RSS feed
 
 import feedparser
 import json
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+import time
+
+import http_validators
+from page_metadata import iter_image_candidates
+import source_cursor
 
 def extract_image_from_article(url):
     """
@@ -22,58 +25,40 @@ def extract_image_from_article(url):
         str: Image URL or None
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try multiple methods to find the image
-        # Method 1: Open Graph image
-        og_image = soup.find('meta', property='og:image')
-        if og_image and og_image.get('content'):
-            return og_image['content']
-        
-        # Method 2: Twitter card image
-        twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-        if twitter_image and twitter_image.get('content'):
-            return twitter_image['content']
-        
-        # Method 3: First image in article content
-        article_img = soup.find('article')
-        if article_img:
-            img = article_img.find('img')
-            if img and img.get('src'):
-                return img['src']
-        
-        # Method 4: Any image with specific class
-        featured_img = soup.find('img', class_=['featured-image', 'post-image', 'hero-image'])
-        if featured_img and featured_img.get('src'):
-            return featured_img['src']
-        
-        return None
+        # og:/twitter:/JSON-LD images from the streamed <head> first; the
+        # full page is only fetched if the head declares none
+        return next(iter_image_candidates(url), None)
         
     except Exception as e:
         print(f"    ⚠️  Could not extract image: {e}")
         return None
 
-def scrape_bensbites():
+def iter_bensbites(deadline=None):
     """
-    Scrape Ben's Bites RSS feed for articles from the last 24 hours
+    Stream Ben's Bites articles from the last 24 hours as they are parsed
     
-    Returns:
-        list: Array of article dictionaries
+    Args:
+        deadline: Optional time.monotonic() value; entries not processed
+            by then are dropped
+    
+    Yields:
+        dict: {"article": article dictionary, "enrichments": []}, then
+            {"source", "validators"} if every entry was processed
     """
     print("🔍 Scraping Ben's Bites...")
     
     RSS_URL = "https://www.bensbites.com/feed"
-    articles = []
+    found = 0
     
     try:
-        # Parse RSS feed
-        feed = feedparser.parse(RSS_URL)
+        # Fetch RSS feed (conditional on the last ETag / Last-Modified)
+        response = http_validators.conditional_get(RSS_URL)
+        if response.status_code == 304:
+            print("✅ Feed unchanged since last run, no new articles")
+            return
+        response.raise_for_status()
+        
+        feed = feedparser.parse(response.content)
         
         if feed.bozo:
             print(f"⚠️  Warning: Feed parsing had issues: {feed.bozo_exception}")
@@ -81,8 +66,18 @@ def scrape_bensbites():
         # Calculate 24-hour cutoff
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
         
+        # Entries already ingested on a previous run are skipped
+        cursor = source_cursor.load_cursor("bensbites")
+        already_ingested = 0
+        completed = True
+        
         # Process entries
         for entry in feed.entries:
+            if deadline is not None and time.monotonic() > deadline:
+                print("  ⏰ Deadline reached, returning partial results")
+                completed = False
+                break
+            
             try:
                 # Parse publication date
                 pub_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
@@ -91,6 +86,11 @@ def scrape_bensbites():
                 if pub_date < cutoff_time:
                     continue
                 
+                # Skip entries saved on a previous run (before any page fetch)
+                if not source_cursor.is_new(cursor, entry.link):
+                    already_ingested += 1
+                    continue
+                
                 # Extract article data
                 article = {
                     "source": "bensbites",
@@ -114,27 +114,48 @@ def scrape_bensbites():
                     print(f"    🖼️  Extracting image from article page...")
                     article["image_url"] = extract_image_from_article(entry.link)
                 
-                articles.append(article)
-                print(f"  ✅ {article['title'][:60]}... {'📷' if article['image_url'] else '❌'}")
-                
             except Exception as e:
                 print(f"  ⚠️  Error processing entry: {e}")
+                completed = False
                 continue
+            
+            found += 1
+            print(f"  ✅ {article['title'][:60]}... {'📷' if article['image_url'] else '❌'}")
+            yield {"article": article, "enrichments": []}
         
-        print(f"✅ Found {len(articles)} articles from Ben's Bites (last 24h)")
-        
-        # Save to .tmp for debugging
-        tmp_dir = Path(__file__).parent.parent / ".tmp"
-        tmp_dir.mkdir(exist_ok=True)
-        
-        with open(tmp_dir / "bensbites_articles.json", "w") as f:
-            json.dump(articles, f, indent=2)
+        print(f"✅ Found {found} articles from Ben's Bites (last 24h)")
+        if already_ingested:
+            print(f"⏭️  Skipped {already_ingested} already ingested entries")
         
-        return articles
+        # Feed fully processed: its validators are remembered once
+        # everything above has been saved
+        if completed:
+            yield {"source": "bensbites", "validators": http_validators.validators(RSS_URL, response)}
         
     except Exception as e:
         print(f"❌ Error scraping Ben's Bites: {e}")
-        return []
+
+def scrape_bensbites(deadline=None):
+    """
+    Scrape Ben's Bites RSS feed for articles from the last 24 hours
+    
+    Args:
+        deadline: Optional time.monotonic() value; entries not processed
+            by then are dropped and the partial result is returned
+    
+    Returns:
+        list: Array of article dictionaries
+    """
+    articles = [record["article"] for record in iter_bensbites(deadline=deadline) if "article" in record]
+    
+    # Save to .tmp for debugging
+    tmp_dir = Path(__file__).parent.parent / ".tmp"
+    tmp_dir.mkdir(exist_ok=True)
+    
+    with open(tmp_dir / "bensbites_articles.json", "w") as f:
+        json.dump(articles, f, indent=2)
+    
+    return articles
 
 if __name__ == "__main__":
     articles = scrape_bensbites()
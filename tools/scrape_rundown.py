@@ -5,239 +5,348 @@ Scrapes latest AI news from The Rundown AI archive
 Extracts individual news items from within each article
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import NavigableString, SoupStrainer
 import json
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import time
 import re
 
+import http_validators
+import source_cursor
+from fetch_engine import iter_fetch
+from html_parsing import parse_content, parse_html
+from page_metadata import extract_page_metadata
+
+def _has_archive_link_class(value):
+    """Class matcher that works on raw attribute strings seen while parsing"""
+    if not value:
+        return False
+    classes = value.split() if isinstance(value, str) else value
+    return "embla__slide__number" in classes
+
+# Archive pages only need their article links built into a tree
+ARCHIVE_LINK_STRAINER = SoupStrainer("a", class_=_has_archive_link_class)
+
+# Classes marking a news item header (h4.hynlcx1.hynlcx5)
+ITEM_HEADER_CLASS = "hynlcx1"
+ITEM_TITLE_CLASS = "hynlcx5"
+
+# Elements that start a new paragraph of enrichment content
+BLOCK_TAGS = frozenset({
+    "p", "li", "div", "section", "blockquote", "figure", "figcaption",
+    "h1", "h2", "h3", "h5", "h6", "table", "tr", "ul", "ol", "pre",
+})
+
+# Subtrees that never contain readable text
+SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg"})
+
+# Summary is the "The Rundown:" section, up to the next labelled section
+RUNDOWN_SUMMARY_RE = re.compile(r'The Rundown:\s*(.+?)(?:The details:|Why it matters:|$)', re.DOTALL | re.IGNORECASE)
+
+def _finish_enrichment(item, paragraphs):
+    """Turn collected paragraphs into the enrichment's content and summary"""
+    full_content = "\n\n".join(paragraphs)
+    item["content"] = full_content
+    
+    rundown_match = RUNDOWN_SUMMARY_RE.search(full_content)
+    if rundown_match:
+        item["summary"] = rundown_match.group(1).strip()[:500]  # Limit to 500 chars
+    elif paragraphs:
+        # Fallback to first paragraph
+        item["summary"] = paragraphs[0][:500]
+    
+    return item
+
 def extract_enrichments(article_soup):
     """
     Extract individual news items from within a Rundown article
     
+    Walks the document once, splitting it into news items at each
+    h4.hynlcx1.hynlcx5 header and collecting each item's paragraphs and
+    first image along the way. An item runs until the next header or the
+    end of the container holding its header block, however long it is.
+    
     Args:
-        article_soup: BeautifulSoup object of the article page
+        article_soup: BeautifulSoup object of the article page (or its
+            content container)
         
     Returns:
         list: Array of enrichment dictionaries
     """
     enrichments = []
     
-    # Find all h4 headers with the specific classes (news item titles)
-    headers = article_soup.select("h4.hynlcx1.hynlcx5")
+    current = None          # enrichment being collected
+    scope = None            # container whose end also ends the current item
+    header_block = None     # block holding the header; its text isn't content
+    in_header_block = False
+    paragraphs = []
+    words = []
     
-    print(f"    🔍 Found {len(headers)} news items in article")
+    def flush_paragraph():
+        if words:
+            text = " ".join(words)
+            if len(text) > 10:
+                paragraphs.append(text)
+            words.clear()
     
-    for idx, header in enumerate(headers):
-        try:
-            enrichment = {
-                "title": header.get_text(strip=True),
-                "summary": "",
-                "image_url": None,
-                "content": "",
-                "position": idx
-            }
-            
-            # Collect content following the header
-            content_parts = []
-            current = header.parent.next_sibling
-            
-            # Traverse siblings until we hit another h4 or run out of content
-            while current and len(content_parts) < 20:  # Safety limit
-                if isinstance(current, str):
-                    current = current.next_sibling
-                    continue
-                    
-                # Stop if we hit another news item header
-                if current.name == 'h4' or (current.find('h4', class_='hynlcx1') if hasattr(current, 'find') else False):
-                    break
-                
-                # Extract images
-                if not enrichment["image_url"]:
-                    img = current.find('img') if hasattr(current, 'find') else None
-                    if img and img.get('src'):
-                        enrichment["image_url"] = img.get('src')
-                
-                # Extract text content
-                text = current.get_text(strip=True) if hasattr(current, 'get_text') else ""
-                if text and len(text) > 10:
-                    content_parts.append(text)
-                
-                current = current.next_sibling
-            
-            # Join content and extract summary
-            full_content = "\n\n".join(content_parts)
-            enrichment["content"] = full_content
-            
-            # Extract summary (usually the first "The Rundown:" section)
-            rundown_match = re.search(r'The Rundown:\s*(.+?)(?:The details:|Why it matters:|$)', full_content, re.DOTALL | re.IGNORECASE)
-            if rundown_match:
-                enrichment["summary"] = rundown_match.group(1).strip()[:500]  # Limit to 500 chars
-            elif content_parts:
-                # Fallback to first paragraph
-                enrichment["summary"] = content_parts[0][:500]
-            
-            enrichments.append(enrichment)
-            print(f"      ✅ Enrichment {idx + 1}: {enrichment['title'][:50]}...")
-            
-        except Exception as e:
-            print(f"      ⚠️  Error extracting enrichment {idx}: {e}")
+    def finish_item():
+        nonlocal current, scope
+        flush_paragraph()
+        if current is not None:
+            enrichments.append(_finish_enrichment(current, list(paragraphs)))
+            print(f"      ✅ Enrichment {len(enrichments)}: {current['title'][:50]}...")
+        current = None
+        scope = None
+        paragraphs.clear()
+    
+    # Iterative depth-first walk: (node, True) marks leaving an element
+    stack = [(article_soup, False)]
+    while stack:
+        node, leaving = stack.pop()
+        
+        if leaving:
+            if node is header_block:
+                in_header_block = False
+            if node.name in BLOCK_TAGS:
+                flush_paragraph()
+            if node is scope:
+                finish_item()
+            continue
+        
+        name = getattr(node, "name", None)
+        
+        # Text node
+        if name is None:
+            if current is not None and not in_header_block and type(node) is NavigableString:
+                text = node.strip()
+                if text:
+                    words.append(text)
             continue
+        
+        if name in SKIP_TAGS:
+            continue
+        
+        if name == "h4" and ITEM_HEADER_CLASS in (node.get("class") or ()):
+            finish_item()
+            if ITEM_TITLE_CLASS in node.get("class"):
+                current = {
+                    "title": node.get_text(strip=True),
+                    "summary": "",
+                    "image_url": None,
+                    "content": "",
+                    "position": len(enrichments)
+                }
+                header_block = node.parent
+                scope = header_block.parent if header_block is not None else None
+                in_header_block = header_block is not None and header_block is not node
+            continue
+        
+        if name == "img" and current is not None and not in_header_block and not current["image_url"]:
+            if node.get("src"):
+                current["image_url"] = node.get("src")
+        
+        if name in BLOCK_TAGS:
+            flush_paragraph()
+        
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.contents))
+    
+    finish_item()
     
+    print(f"    🔍 Found {len(enrichments)} news items in article")
     return enrichments
 
 
-def scrape_rundown():
+def _parse_article(article_url, content, cutoff_time):
     """
-    Scrape The Rundown AI for articles from the last 24 hours
-    Now includes enrichments (individual news items within each article)
+    Build the record for one fetched Rundown article page
     
     Returns:
-        dict: {
-            "articles": Array of article dictionaries,
-            "enrichments": Dict mapping article URLs to their enrichments
-        }
+        tuple: (record or None if the article is skipped, True if it was
+            published before cutoff_time)
+    """
+    print(f"  📰 Parsing article: {article_url}")
+    
+    # Title, real publish time, summary and lead image from
+    # JSON-LD / OpenGraph in the <head>, before any layout heuristics
+    metadata = extract_page_metadata(content, base_url=article_url)
+    title = metadata["title"] or "No title"
+    pub_date = metadata["published"]
+    
+    if not pub_date:
+        print(f"    ⚠️  No date found, skipping")
+        return None, False
+    
+    # Check if within 24 hours
+    if pub_date < cutoff_time:
+        print(f"    ⏭️  Article too old ({pub_date:%b %d, %Y %H:%M}), skipping")
+        return None, True
+    
+    # Extract enrichments (individual news items) from the
+    # content container alone
+    enrichments = extract_enrichments(parse_content(content))
+    
+    article = {
+        "source": "rundown",
+        "title": title,
+        "url": article_url,
+        "published_date": pub_date.isoformat(),
+        "summary": metadata["description"],
+        "author": metadata["author"] or "Rowan Cheung",  # Default author for The Rundown
+        "image_url": metadata["image_url"],
+        "tags": [],  # filled in by the tagger when saved
+        "enrichment_count": len(enrichments)
+    }
+    
+    print(f"    ✅ {title[:60]}... ({len(enrichments)} enrichments)")
+    return {"article": article, "enrichments": enrichments}, False
+
+
+def iter_rundown(deadline=None):
+    """
+    Stream The Rundown AI articles from the last 24 hours, each with its
+    enrichments, as soon as its page has been fetched and parsed
+    
+    Args:
+        deadline: Optional time.monotonic() value; page fetches still in
+            flight by then are cancelled
+    
+    Yields:
+        dict: {"article": article dictionary, "enrichments": list of enrichments},
+            then {"source", "validators"} if every article was processed
     """
     print("🔍 Scraping The Rundown AI (with enrichments)...")
     
     ARCHIVE_URL = "https://www.therundown.ai/archive"
     BASE_URL = "https://www.therundown.ai"
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
-    
-    articles = []
-    enrichments_map = {}
+    found = 0
     
     try:
         # Step 1: Fetch archive page
         print("  📄 Fetching archive page...")
-        response = requests.get(ARCHIVE_URL, headers=headers, timeout=10)
+        response = http_validators.conditional_get(ARCHIVE_URL)
+        if response.status_code == 304:
+            print("✅ Archive unchanged since last run, no new articles")
+            return
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = parse_html(response.content, parse_only=ARCHIVE_LINK_STRAINER)
         
         # Find article links
         article_links = soup.select("a.embla__slide__number")
         
         if not article_links:
             print("  ⚠️  No article links found. HTML structure may have changed.")
-            return {"articles": [], "enrichments": {}}
+            return
         
         print(f"  📋 Found {len(article_links)} article links")
         
         # Calculate 24-hour cutoff
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
         
-        # Step 2: Fetch individual articles (limit to top 5 for efficiency)
-        for i, link in enumerate(article_links[:5]):
-            try:
-                article_url = link.get("href")
-                if not article_url.startswith("http"):
-                    article_url = BASE_URL + article_url
-                
-                print(f"  🔗 Fetching article {i+1}/5: {article_url}")
-                
-                # Fetch article page
-                time.sleep(0.5)  # Be polite, avoid rate limiting
-                article_response = requests.get(article_url, headers=headers, timeout=10)
-                article_response.raise_for_status()
-                
-                article_soup = BeautifulSoup(article_response.content, "html.parser")
-                
-                # Extract title
-                title_elem = article_soup.select_one("h1")
-                title = title_elem.get_text(strip=True) if title_elem else "No title"
-                
-                # Extract date (look for date patterns)
-                date_text = None
-                date_spans = article_soup.find_all("span")
-                for span in date_spans:
-                    text = span.get_text(strip=True)
-                    # Look for date pattern like "Jan 28, 2026"
-                    if re.search(r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},\s+\d{4}", text):
-                        date_text = text
-                        break
-                
-                if not date_text:
-                    print(f"    ⚠️  No date found, skipping")
-                    continue
-                
-                # Parse date
-                try:
-                    pub_date = datetime.strptime(date_text, "%b %d, %Y")
-                    pub_date = pub_date.replace(tzinfo=timezone.utc)
-                except ValueError:
-                    print(f"    ⚠️  Could not parse date: {date_text}")
-                    continue
-                
-                # Check if within 24 hours
-                if pub_date < cutoff_time:
-                    print(f"    ⏭️  Article too old ({date_text}), stopping")
-                    break
-                
-                # Extract summary (first paragraph or subtitle)
-                summary = ""
-                summary_elem = article_soup.select_one("h3") or article_soup.select_one("p")
-                if summary_elem:
-                    summary = summary_elem.get_text(strip=True)
-                
-                # Extract image
-                image_url = None
-                img_elem = article_soup.select_one("img")
-                if img_elem:
-                    image_url = img_elem.get("src")
-                    if image_url and not image_url.startswith("http"):
-                        image_url = BASE_URL + image_url
-                
-                # Extract author
-                author = "Rowan Cheung"  # Default author for The Rundown
-                
-                # Extract enrichments (individual news items)
-                enrichments = extract_enrichments(article_soup)
-                enrichments_map[article_url] = enrichments
-                
-                article = {
-                    "source": "rundown",
-                    "title": title,
-                    "url": article_url,
-                    "published_date": pub_date.isoformat(),
-                    "summary": summary,
-                    "author": author,
-                    "image_url": image_url,
-                    "tags": ["AI", "News"],
-                    "enrichment_count": len(enrichments)
-                }
-                
-                articles.append(article)
-                print(f"    ✅ {title[:60]}... ({len(enrichments)} enrichments)")
-                
-            except Exception as e:
-                print(f"    ⚠️  Error processing article: {e}")
+        article_urls = []
+        for link in article_links:
+            article_url = link.get("href")
+            if not article_url:
                 continue
+            if not article_url.startswith("http"):
+                article_url = BASE_URL + article_url
+            article_urls.append(article_url)
+        article_urls = list(dict.fromkeys(article_urls))
         
-        print(f"✅ Found {len(articles)} articles from The Rundown AI (last 24h)")
+        # Skip articles saved on a previous run before fetching anything
+        cursor = source_cursor.load_cursor("rundown")
+        already_ingested = [url for url in article_urls if source_cursor.seen_url(cursor, url)]
+        if already_ingested:
+            print(f"  ⏭️  Skipping {len(already_ingested)} already ingested or too old articles")
+        article_urls = [url for url in article_urls if not source_cursor.seen_url(cursor, url)]
         
-        # Save to .tmp for debugging
-        tmp_dir = Path(__file__).parent.parent / ".tmp"
-        tmp_dir.mkdir(exist_ok=True)
+        # Step 2: Fetch article pages concurrently, parsing each as it arrives.
+        # The archive lists newest first, so once an article is too old the
+        # links after it are too; the fetch stops as soon as every link
+        # before the oldest too-old one has been handled
+        print(f"  🔗 Fetching {len(article_urls)} articles concurrently...")
+        completed = True
+        archive_index = {url: i for i, url in enumerate(article_urls)}
+        too_old_from = len(article_urls)
+        unhandled = set(range(len(article_urls)))
+        too_old = []
         
-        output = {
-            "articles": articles,
-            "enrichments": enrichments_map
-        }
+        for article_url, content, error in iter_fetch(article_urls, deadline=deadline):
+            unhandled.discard(archive_index[article_url])
+            try:
+                if error:
+                    raise error
+                record, is_too_old = _parse_article(article_url, content, cutoff_time)
+            except Exception as e:
+                print(f"    ⚠️  Error processing article {article_url}: {e}")
+                completed = False
+                record, is_too_old = None, False
+            
+            if is_too_old:
+                too_old.append(article_url)
+                too_old_from = min(too_old_from, archive_index[article_url])
+            if record:
+                found += 1
+                yield record
+            
+            # Everything still in flight is listed after a too-old article
+            if not any(i < too_old_from for i in unhandled):
+                if unhandled:
+                    print(f"  ⏹️  Remaining {len(unhandled)} links are older, not waiting for them")
+                break
         
-        with open(tmp_dir / "rundown_articles.json", "w") as f:
-            json.dump(output, f, indent=2)
+        # Too-old articles never need fetching again
+        source_cursor.mark_seen("rundown", too_old)
         
-        return output
+        print(f"✅ Found {found} articles from The Rundown AI (last 24h)")
+        
+        # Archive fully processed: its validators are remembered once
+        # everything above has been saved
+        if completed:
+            yield {"source": "rundown", "validators": http_validators.validators(ARCHIVE_URL, response)}
         
     except Exception as e:
         print(f"❌ Error scraping The Rundown AI: {e}")
-        return {"articles": [], "enrichments": {}}
+
+def scrape_rundown(deadline=None):
+    """
+    Scrape The Rundown AI for articles from the last 24 hours
+    Now includes enrichments (individual news items within each article)
+    
+    Args:
+        deadline: Optional time.monotonic() value; page fetches still in
+            flight by then are cancelled and the partial result is returned
+    
+    Returns:
+        dict: {
+            "articles": Array of article dictionaries,
+            "enrichments": Dict mapping article URLs to their enrichments
+        }
+    """
+    articles = []
+    enrichments_map = {}
+    
+    for record in iter_rundown(deadline=deadline):
+        if "article" not in record:
+            continue
+        articles.append(record["article"])
+        enrichments_map[record["article"]["url"]] = record["enrichments"]
+    
+    # Save to .tmp for debugging
+    tmp_dir = Path(__file__).parent.parent / ".tmp"
+    tmp_dir.mkdir(exist_ok=True)
+    
+    output = {
+        "articles": articles,
+        "enrichments": enrichments_map
+    }
+    
+    with open(tmp_dir / "rundown_articles.json", "w") as f:
+        json.dump(output, f, indent=2)
+    
+    return output
 
 if __name__ == "__main__":
     result = scrape_rundown()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Search Index
+Local full-text index (SQLite FTS5) over article and enrichment titles,
+summaries and content, BM25-ranked with prefix and phrase queries. The save
+path updates it as rows are written; it persists in .tmp/ between runs.
+
+    python tools/search_index.py "open source" agent* --limit 10
+    python tools/search_index.py --rebuild
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+DB_FILE = STATE_DIR / "search_index.sqlite3"
+
+# BM25 weights for the title, summary and content columns
+COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+
+DEFAULT_LIMIT = 20
+
+# Query syntax: "quoted phrases", prefix* terms and plain terms (all required)
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+")
+
+
+@contextmanager
+def _db():
+    """Open the index for one operation, committing on success"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    try:
+        _init(conn)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    # One row per indexed item; its rowid is the FTS row's rowid
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS documents (
+            rowid INTEGER PRIMARY KEY,
+            key TEXT UNIQUE NOT NULL,
+            kind TEXT NOT NULL,
+            article_url TEXT NOT NULL,
+            article_id TEXT,
+            position INTEGER,
+            source TEXT,
+            published_date TEXT,
+            content_hash TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS documents_article_url ON documents (article_url)")
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+            title, summary, content,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """
+    )
+
+
+def _content_hash(title, summary, content):
+    return hashlib.sha256(json.dumps([title, summary, content], ensure_ascii=False).encode()).hexdigest()
+
+
+def _put(conn, key, kind, article, position, title, summary, content):
+    """Insert or refresh one document; unchanged text isn't reindexed"""
+    digest = _content_hash(title, summary, content)
+    row = conn.execute("SELECT rowid, content_hash FROM documents WHERE key = ?", (key,)).fetchone()
+    metadata = (article.get("id"), article.get("source"), article.get("published_date"))
+
+    if row and row[1] == digest:
+        conn.execute(
+            "UPDATE documents SET article_id = COALESCE(?, article_id), source = ?, published_date = ? WHERE rowid = ?",
+            (*metadata, row[0]),
+        )
+        return False
+
+    if row:
+        rowid = row[0]
+        conn.execute("DELETE FROM search WHERE rowid = ?", (rowid,))
+        conn.execute(
+            "UPDATE documents SET article_id = COALESCE(?, article_id), source = ?, published_date = ?, content_hash = ? WHERE rowid = ?",
+            (*metadata, digest, rowid),
+        )
+    else:
+        rowid = conn.execute(
+            "INSERT INTO documents (key, kind, article_url, position, article_id, source, published_date, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, kind, article["url"], position, *metadata, digest),
+        ).lastrowid
+    conn.execute(
+        "INSERT INTO search (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+        (rowid, title or "", summary or "", content or ""),
+    )
+    return True
+
+
+def _delete_where(conn, clause, params):
+    rowids = [r[0] for r in conn.execute(f"SELECT rowid FROM documents WHERE {clause}", params)]
+    conn.executemany("DELETE FROM search WHERE rowid = ?", [(r,) for r in rowids])
+    conn.executemany("DELETE FROM documents WHERE rowid = ?", [(r,) for r in rowids])
+    return len(rowids)
+
+
+def index_records(records):
+    """
+    Add or update articles and their enrichments
+
+    An article given with enrichments has its indexed enrichments replaced
+    by them; one given without keeps whatever was indexed before (the save
+    path treats a missing list the same way).
+
+    Args:
+        records: Iterable of {"article": dict with "url" (and "id" once
+            saved), "enrichments": list of dicts with "position"}
+
+    Returns:
+        int: Documents (re)indexed
+    """
+    changed = 0
+    with _db() as conn:
+        for record in records:
+            article = record["article"]
+            url = article["url"]
+            changed += _put(
+                conn, f"a:{url}", "article", article, None,
+                article.get("title"), article.get("summary"), article.get("content"),
+            )
+
+            enrichments = record.get("enrichments") or []
+            if not enrichments:
+                continue
+            positions = set()
+            for enrichment in enrichments:
+                position = enrichment.get("position", 0)
+                positions.add(position)
+                changed += _put(
+                    conn, f"e:{url}#{position}", "enrichment", article, position,
+                    enrichment.get("title"), enrichment.get("summary"), enrichment.get("content"),
+                )
+            placeholders = ",".join("?" * len(positions))
+            _delete_where(
+                conn, f"kind = 'enrichment' AND article_url = ? AND position NOT IN ({placeholders})",
+                (url, *positions),
+            )
+    return changed
+
+
+def remove(article_urls):
+    """Drop articles (and their enrichments) from the index"""
+    with _db() as conn:
+        return sum(_delete_where(conn, "article_url = ?", (url,)) for url in article_urls)
+
+
+def to_match_expression(query):
+    """
+    Translate a user query into an FTS5 MATCH expression
+
+    "quoted text" is a phrase, a trailing * makes a prefix term, and every
+    other word is a plain term; all parts must match. A term with inner
+    punctuation (gpt-4o) is matched as the phrase of its words. FTS5
+    operators and punctuation in the input are treated as text, never as
+    syntax.
+    """
+    parts = []
+    for phrase, term in _QUERY_TOKEN.findall(query):
+        words = _WORD.findall(phrase or term)
+        if not words:
+            continue
+        prefix = not phrase and term.endswith("*")
+        parts.append('"' + " ".join(words) + '"' + ("*" if prefix else ""))
+    return " AND ".join(parts)
+
+
+def search(query, limit=DEFAULT_LIMIT, source=None, kind=None):
+    """
+    Find articles and enrichments matching a query, best first
+
+    Args:
+        query: Search text (see to_match_expression)
+        limit: Maximum results
+        source: Only results from this source (e.g. "rundown")
+        kind: Only "article" or "enrichment" results
+
+    Returns:
+        list: Dicts with kind, article_url, article_id, position, source,
+            published_date, title, snippet and score (lower is better)
+    """
+    expression = to_match_expression(query)
+    if not expression:
+        return []
+
+    clauses, params = ["search MATCH ?"], [expression]
+    if source:
+        clauses.append("d.source = ?")
+        params.append(source)
+    if kind:
+        clauses.append("d.kind = ?")
+        params.append(kind)
+
+    sql = f"""
+        SELECT d.kind, d.article_url, d.article_id, d.position, d.source, d.published_date,
+               search.title, snippet(search, -1, '[', ']', '…', 16),
+               bm25(search, {", ".join(map(str, COLUMN_WEIGHTS))}) AS score
+        FROM search JOIN documents d ON d.rowid = search.rowid
+        WHERE {" AND ".join(clauses)}
+        ORDER BY score
+        LIMIT ?
+    """
+    columns = ("kind", "article_url", "article_id", "position", "source", "published_date", "title", "snippet", "score")
+    with _db() as conn:
+        return [dict(zip(columns, row)) for row in conn.execute(sql, (*params, limit))]
+
+
+def rebuild(base_url=None, api_key=None):
+    """
+    Recreate the index from the database
+
+    Articles are streamed first, then enrichments with their parent's URL
+    embedded, so memory stays flat however large the tables are.
+
+    Returns:
+        int: Documents indexed
+    """
+    import postgrest_reader
+
+    base_url = base_url or os.getenv("SUPABASE_URL")
+    api_key = api_key or os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    if not base_url or not api_key:
+        raise ValueError("Missing SUPABASE_URL or API key")
+
+    articles = postgrest_reader.iter_rows(
+        base_url, api_key, "articles", "id,url,title,summary,source,published_date"
+    )
+    enrichments = postgrest_reader.iter_rows(
+        base_url, api_key, "article_enrichments",
+        ["position", "title", "summary", "content", "articles(id,url,source,published_date)"],
+    )
+
+    clear()
+    indexed = 0
+    with _db() as conn:
+        for article in articles:
+            indexed += _put(
+                conn, f"a:{article['url']}", "article", article, None,
+                article.get("title"), article.get("summary"), None,
+            )
+        for enrichment in enrichments:
+            article = enrichment.get("articles")
+            if not article:
+                continue
+            indexed += _put(
+                conn, f"e:{article['url']}#{enrichment['position']}", "enrichment", article, enrichment["position"],
+                enrichment.get("title"), enrichment.get("summary"), enrichment.get("content"),
+            )
+        conn.execute("INSERT INTO search (search) VALUES ('optimize')")
+    return indexed
+
+
+def clear():
+    """Forget everything"""
+    with _db() as conn:
+        conn.execute("DELETE FROM search")
+        conn.execute("DELETE FROM documents")
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Search scraped articles and enrichments")
+    parser.add_argument("query", nargs="*", help='Terms, "phrases" and prefix* terms')
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Maximum results")
+    parser.add_argument("--source", help="Only results from this source")
+    parser.add_argument("--kind", choices=("article", "enrichment"), help="Only this kind of result")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index everything from Supabase")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        start = time.perf_counter()
+        count = rebuild()
+        print(f"🔎 Search index rebuilt: {count} documents in {time.perf_counter() - start:.1f}s")
+
+    if not args.query:
+        if not args.rebuild:
+            with _db() as conn:
+                count = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            print(f"🔎 {count} indexed documents")
+        return
+
+    start = time.perf_counter()
+    results = search(" ".join(args.query), limit=args.limit, source=args.source, kind=args.kind)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for result in results:
+        label = result["article_url"] if result["kind"] == "article" else f"{result['article_url']} #{result['position']}"
+        print(f"{result['score']:7.2f}  {result['title']}")
+        print(f"         {result['snippet']}")
+        print(f"         {label}")
+    print(f"\n🔎 {len(results)} results in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
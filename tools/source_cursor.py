@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Source Cursors
+Per-source recently ingested URLs (plus the newest published date, for
+reporting) so scrapers can skip entries that were already saved on a
+previous run
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+CURSOR_FILE = STATE_DIR / "source_cursors.json"
+
+# How many ingested URLs to remember per source
+RECENT_URL_LIMIT = 500
+
+_lock = threading.Lock()
+
+
+def _load_all():
+    try:
+        with open(CURSOR_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_all(cursors):
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = CURSOR_FILE.with_suffix(".json.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(cursors, f, indent=2)
+    os.replace(tmp_file, CURSOR_FILE)
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def load_cursor(source):
+    """
+    Load the cursor for a source
+
+    Args:
+        source: Source name (e.g. "bensbites", "rundown")
+
+    Returns:
+        dict: {"newest": ISO timestamp or None, "recent_urls": set of URLs}
+    """
+    with _lock:
+        stored = _load_all().get(source, {})
+
+    return {
+        "newest": stored.get("newest"),
+        "recent_urls": set(stored.get("recent_urls", [])),
+    }
+
+
+def seen_url(cursor, url):
+    """True if this URL was already ingested (check before fetching a page)"""
+    return url in cursor["recent_urls"]
+
+
+def is_new(cursor, url):
+    """
+    True if an entry has not been ingested yet
+
+    Only the recently ingested URLs decide this, never the high-water
+    mark: an entry older than the newest saved one may still have failed
+    to fetch or save, and must be picked up again on the next run.
+    Scrapers bound entries by their own 24h window.
+
+    Args:
+        cursor: Cursor from load_cursor
+        url: Entry URL
+    """
+    return not seen_url(cursor, url)
+
+
+def record(articles):
+    """
+    Advance the cursors of every source in a batch of saved articles
+
+    Call this only after the articles have been written, so an entry that
+    failed to save is picked up again on the next run.
+
+    Args:
+        articles: List of article dictionaries with source, url, published_date
+    """
+    if not articles:
+        return
+
+    with _lock:
+        cursors = _load_all()
+
+        for article in articles:
+            source = article.get("source")
+            if not source or not article.get("url"):
+                continue
+
+            cursor = cursors.setdefault(source, {"newest": None, "recent_urls": []})
+
+            recent = cursor["recent_urls"]
+            if article["url"] in recent:
+                recent.remove(article["url"])
+            recent.append(article["url"])
+            del recent[:-RECENT_URL_LIMIT]
+
+            published = article.get("published_date")
+            try:
+                if published and (
+                    not cursor["newest"] or _parse_date(published) > _parse_date(cursor["newest"])
+                ):
+                    cursor["newest"] = _parse_date(published).isoformat()
+            except (TypeError, ValueError):
+                pass
+
+        _save_all(cursors)
+
+
+def mark_seen(source, urls):
+    """
+    Remember URLs that never need fetching again (e.g. articles already
+    too old to ingest) without moving the source's high-water mark
+
+    Args:
+        source: Source name
+        urls: URLs to add to the source's recent URLs
+    """
+    if not urls:
+        return
+
+    with _lock:
+        cursors = _load_all()
+        cursor = cursors.setdefault(source, {"newest": None, "recent_urls": []})
+        recent = cursor["recent_urls"]
+        for url in urls:
+            if url in recent:
+                recent.remove(url)
+            recent.append(url)
+        del recent[:-RECENT_URL_LIMIT]
+        _save_all(cursors)
+
+
+if __name__ == "__main__":
+    for source, cursor in _load_all().items():
+        print(f"📍 {source}: newest={cursor['newest']} ({len(cursor['recent_urls'])} recent URLs)")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Story Clusters
+Links near-duplicate items (the same launch covered by Ben's Bites and The
+Rundown, as an article or an enrichment) into stories. Each item gets a
+MinHash signature of its text; candidates come from LSH band buckets, so
+placing an item costs a few indexed lookups however long the history is.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent.parent / ".tmp"))
+DB_FILE = STATE_DIR / "story_clusters.sqlite3"
+
+# 128 hash functions in 32 bands of 4 rows: pairs with Jaccard similarity
+# above ~0.42 are likely to share a bucket in at least one band
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Candidates are linked when their estimated Jaccard similarity reaches this
+SIMILARITY_THRESHOLD = 0.5
+
+# Only the start of long enrichment content is used, next to title and summary
+CONTENT_WORDS = 60
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Fixed seed: signatures must stay comparable across runs
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9]+(?:['.-][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its it's of on or "
+    "that the their this to was were will with you your new now just how what why".split()
+)
+
+
+@contextmanager
+def _db():
+    """Open the cluster store for one operation, committing on success"""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    try:
+        _init(conn)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            key TEXT PRIMARY KEY,
+            parent TEXT NOT NULL,
+            story_id TEXT NOT NULL,
+            signature BLOB,
+            added_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS items_story ON items (story_id)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            key TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)")
+    conn.execute("CREATE INDEX IF NOT EXISTS buckets_key ON buckets (key)")
+
+
+def shingles(text):
+    """Distinct content words of a text (lowercased, stopwords dropped)"""
+    return {w for w in _WORD.findall((text or "").lower()) if w not in _STOPWORDS and len(w) > 1}
+
+
+def signature(text):
+    """
+    MinHash signature of a text
+
+    Returns:
+        numpy.ndarray: NUM_PERM uint32 values, or None for a text without words
+    """
+    words = shingles(text)
+    if not words:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(w.encode(), digest_size=4).digest(), "little") for w in words),
+        dtype=np.uint64,
+        count=len(words),
+    )
+    # (a * x + b) mod p for every hash function at once, minimum over words
+    permuted = ((np.outer(hashes, _A) + _B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def _band_buckets(sig):
+    """(band, bucket) pairs an item is filed under"""
+    rows = sig.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        (band, int.from_bytes(hashlib.blake2b(rows[band].tobytes(), digest_size=8).digest(), "little", signed=True))
+        for band in range(BANDS)
+    ]
+
+
+def item_text(title, summary=None, content=None):
+    """The text an item is compared on"""
+    lead = " ".join((content or "").split()[:CONTENT_WORDS])
+    return " ".join(part for part in (title, summary, lead) if part)
+
+
+def _find_story(conn, key, parent, sig):
+    """Stories of stored items similar to sig (items of the same parent excluded)"""
+    candidates = set()
+    for band, bucket in _band_buckets(sig):
+        candidates.update(
+            row[0] for row in conn.execute("SELECT key FROM buckets WHERE band = ? AND bucket = ?", (band, bucket))
+        )
+    candidates.discard(key)
+
+    matches = []
+    for candidate in candidates:
+        row = conn.execute(
+            "SELECT parent, story_id, signature, added_at FROM items WHERE key = ?", (candidate,)
+        ).fetchone()
+        if row is None or row[0] == parent or row[2] is None:
+            continue
+        if similarity(sig, np.frombuffer(row[2], dtype=np.uint32)) >= SIMILARITY_THRESHOLD:
+            matches.append((row[3], row[1]))
+    return matches
+
+
+def assign(items):
+    """
+    Place items into stories, creating or merging stories as needed
+
+    Items already placed with the same text keep their story. An item whose
+    matches span several stories joins them: every item of the other
+    stories is relabelled to the oldest one (union-find with the whole
+    path compressed at once).
+
+    Args:
+        items: Iterable of dicts with "key" (stable item id), "parent"
+            (article URL; items of one article never link to each other)
+            and "text"
+
+    Returns:
+        tuple: (story_ids, merged) where story_ids maps each key to its story
+            id and merged maps each absorbed story id to the one it joined
+    """
+    story_ids = {}
+    merged = {}
+    now = time.time()
+
+    with _db() as conn:
+        for item in items:
+            key = item["key"]
+            sig = signature(item["text"])
+            blob = sig.tobytes() if sig is not None else None
+
+            row = conn.execute("SELECT story_id, signature FROM items WHERE key = ?", (key,)).fetchone()
+            if row and row[1] == blob:
+                story_ids[key] = row[0]
+                continue
+
+            matches = _find_story(conn, key, item["parent"], sig) if sig is not None else []
+            if matches:
+                stories = {story for _, story in sorted(matches)}
+                story = min(matches)[1]
+                absorbed = stories - {story}
+                for other in absorbed:
+                    conn.execute("UPDATE items SET story_id = ? WHERE story_id = ?", (story, other))
+                    merged[other] = story
+                    for k, s in story_ids.items():
+                        if s == other:
+                            story_ids[k] = story
+            else:
+                story = row[0] if row else str(uuid.uuid4())
+
+            conn.execute("DELETE FROM buckets WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT INTO items (key, parent, story_id, signature, added_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET story_id = excluded.story_id, signature = excluded.signature",
+                (key, item["parent"], story, blob, now),
+            )
+            if sig is not None:
+                conn.executemany(
+                    "INSERT INTO buckets (band, bucket, key) VALUES (?, ?, ?)",
+                    [(band, bucket, key) for band, bucket in _band_buckets(sig)],
+                )
+            story_ids[key] = story
+
+    # A story absorbed later in the batch may itself have absorbed others
+    for other, story in merged.items():
+        while story in merged:
+            story = merged[story]
+        merged[other] = story
+    return story_ids, merged
+
+
+def record_items(records):
+    """
+    Story items for scraped records, keyed like the search index
+
+    Args:
+        records: List of {"article": dict, "enrichments": list}
+
+    Returns:
+        list: Items for assign()
+    """
+    items = []
+    for record in records:
+        article = record["article"]
+        url = article["url"]
+        items.append({
+            "key": f"a:{url}",
+            "parent": url,
+            "text": item_text(article.get("title"), article.get("summary")),
+        })
+        for enrichment in record.get("enrichments") or []:
+            items.append({
+                "key": f"e:{url}#{enrichment.get('position', 0)}",
+                "parent": url,
+                "text": item_text(enrichment.get("title"), enrichment.get("summary"), enrichment.get("content")),
+            })
+    return items
+
+
+def clear():
+    """Forget all stories"""
+    with _db() as conn:
+        conn.execute("DELETE FROM buckets")
+        conn.execute("DELETE FROM items")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        clear()
+        print("🧹 Story clusters cleared")
+    else:
+        with _db() as conn:
+            items = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            stories = conn.execute("SELECT COUNT(DISTINCT story_id) FROM items").fetchone()[0]
+            linked = conn.execute(
+                "SELECT COUNT(*) FROM (SELECT story_id FROM items GROUP BY story_id HAVING COUNT(*) > 1)"
+            ).fetchone()[0]
+        print(f"🧩 {items} items in {stories} stories ({linked} covered more than once)")
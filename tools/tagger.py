@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Tagger
+Offline topic tagging for articles and enrichments. Each item becomes a
+hashed TF-IDF vector (unigrams and bigrams) and is scored against labelled
+keyword centroids; a whole batch is scored in one vectorized NumPy pass.
+
+    python tools/tagger.py "OpenAI releases an open-weight reasoning model"
+    python tools/tagger.py --bench
+"""
+
+import argparse
+import math
+import re
+import time
+import zlib
+
+import numpy as np
+
+# Label -> keywords (single words or two-word phrases) that characterise it
+LABELS = {
+    "Models": [
+        "model", "models", "llm", "gpt", "claude", "gemini", "llama", "mistral", "grok", "deepseek",
+        "qwen", "reasoning", "benchmark", "benchmarks", "parameters", "weights", "frontier",
+        "context window", "multimodal", "fine tuning", "release", "released",
+    ],
+    "Agents": [
+        "agent", "agents", "agentic", "autonomous", "workflow", "workflows", "computer use",
+        "browser", "operator", "tool use", "tools", "automation", "automate", "mcp", "assistant",
+    ],
+    "Coding": [
+        "coding", "code", "developer", "developers", "programming", "ide", "github", "copilot",
+        "cursor", "software", "engineers", "engineering", "api", "sdk", "repo", "vibe coding",
+    ],
+    "Research": [
+        "research", "researchers", "paper", "study", "lab", "scientists", "science", "breakthrough",
+        "dataset", "training", "arxiv", "alignment", "interpretability",
+    ],
+    "Funding": [
+        "funding", "raises", "raised", "valuation", "investment", "investors", "series",
+        "billion", "million", "acquisition", "acquires", "acquired", "ipo", "startup", "startups",
+    ],
+    "Policy": [
+        "policy", "regulation", "regulators", "law", "laws", "government", "senate", "congress",
+        "eu", "act", "lawsuit", "court", "copyright", "ban", "compliance", "white house",
+    ],
+    "Safety": [
+        "safety", "risk", "risks", "misuse", "jailbreak", "guardrails", "security", "deepfake",
+        "deepfakes", "privacy", "ethics", "harmful", "red teaming",
+    ],
+    "Image & Video": [
+        "image", "images", "video", "videos", "sora", "midjourney", "veo", "runway", "diffusion",
+        "generation", "visual", "photo", "photos", "art", "film", "animation",
+    ],
+    "Audio": [
+        "audio", "voice", "voices", "speech", "music", "podcast", "elevenlabs", "transcription",
+        "tts", "speech synthesis", "sound",
+    ],
+    "Hardware": [
+        "chip", "chips", "gpu", "gpus", "nvidia", "semiconductor", "data center", "datacenter",
+        "compute", "hardware", "device", "devices", "tpu", "energy", "power",
+    ],
+    "Robotics": [
+        "robot", "robots", "robotics", "humanoid", "humanoids", "self driving", "autonomous vehicles",
+        "waymo", "tesla", "drone", "drones",
+    ],
+    "Open Source": [
+        "open source", "open weight", "open weights", "hugging face", "huggingface", "open model",
+        "permissive", "license", "community",
+    ],
+    "Business": [
+        "enterprise", "business", "businesses", "revenue", "customers", "pricing", "subscription",
+        "market", "sales", "partnership", "deal", "companies", "ceo", "jobs", "layoffs",
+    ],
+    "Products": [
+        "app", "apps", "feature", "features", "launch", "launches", "launched", "rollout",
+        "available", "users", "update", "chatgpt", "search", "plugin", "extension",
+    ],
+}
+
+# Hashed feature space; collisions between the few thousand distinct terms
+# of a batch and the keyword features are negligible at this size
+N_FEATURES = 1 << 18
+
+# An item gets up to MAX_TAGS labels whose cosine score reaches MIN_SCORE
+MAX_TAGS = 3
+MIN_SCORE = 0.12
+
+# The title counts this many times as much as body text
+TITLE_WEIGHT = 3
+
+# Long enrichment content is cut to its first this many words
+MAX_WORDS = 250
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _features(text):
+    """Hashed unigram and bigram feature ids of a text"""
+    words = _TOKEN.findall(text.lower())[:MAX_WORDS]
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return [zlib.crc32(term.encode()) % N_FEATURES for term in terms]
+
+
+def _build_centroids():
+    """
+    Label centroid matrix (labels x features)
+
+    The IDF is fixed, derived from the keyword lists themselves: a keyword
+    shared by several labels says less about any one of them.
+    """
+    keyword_labels = {}
+    for label, keywords in LABELS.items():
+        for keyword in keywords:
+            words = _TOKEN.findall(keyword.lower())
+            # _features only produces unigrams and bigrams
+            if not 1 <= len(words) <= 2:
+                raise ValueError(f"Keyword {keyword!r} of {label} must be one or two words")
+            keyword_labels.setdefault(" ".join(words), set()).add(label)
+
+    idf = np.ones(N_FEATURES, dtype=np.float32)
+    centroids = np.zeros((len(LABELS), N_FEATURES), dtype=np.float32)
+    for keyword, labels in keyword_labels.items():
+        feature = zlib.crc32(keyword.encode()) % N_FEATURES
+        weight = math.log(1 + len(LABELS) / len(labels))
+        idf[feature] = weight
+        for label in labels:
+            centroids[list(LABELS).index(label), feature] = weight
+
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    return idf, centroids
+
+
+_IDF, _CENTROIDS = _build_centroids()
+_LABEL_NAMES = np.array(list(LABELS))
+
+
+def score(texts):
+    """
+    Cosine similarity of every text to every label centroid
+
+    Args:
+        texts: List of (title, body) pairs
+
+    Returns:
+        numpy.ndarray: len(texts) x len(LABELS) scores
+    """
+    n = len(texts)
+    item_ids, feature_ids = [], []
+    for i, (title, body) in enumerate(texts):
+        features = _features(title or "") * TITLE_WEIGHT + _features(body or "")
+        feature_ids.extend(features)
+        item_ids.extend([i] * len(features))
+    if not feature_ids:
+        return np.zeros((n, len(LABELS)), dtype=np.float32)
+
+    # Term counts per (item, feature) pair, then sublinear TF x IDF
+    pairs = np.array(item_ids, dtype=np.int64) * N_FEATURES + np.array(feature_ids, dtype=np.int64)
+    pairs, counts = np.unique(pairs, return_counts=True)
+    items, features = pairs // N_FEATURES, pairs % N_FEATURES
+    weights = (1 + np.log(counts)) * _IDF[features]
+
+    norms = np.sqrt(np.bincount(items, weights=weights * weights, minlength=n))
+    norms[norms == 0] = 1
+
+    # Dot products with every centroid at once: gather the centroid columns
+    # of each nonzero and sum them per item
+    contributions = _CENTROIDS[:, features] * weights
+    scores = np.stack([np.bincount(items, weights=row, minlength=n) for row in contributions], axis=1)
+    return scores / norms[:, None]
+
+
+def tag(texts, max_tags=MAX_TAGS, min_score=MIN_SCORE):
+    """
+    Topic tags for a batch of texts
+
+    Args:
+        texts: List of (title, body) pairs
+        max_tags: Most tags per item
+        min_score: Lowest cosine score that earns a tag
+
+    Returns:
+        list: A list of tag names per text, best first
+    """
+    if not texts:
+        return []
+    scores = score(texts)
+    order = np.argsort(-scores, axis=1)[:, :max_tags]
+    return [
+        [str(_LABEL_NAMES[j]) for j in row if scores[i, j] >= min_score]
+        for i, row in enumerate(order)
+    ]
+
+
+def tag_records(records):
+    """
+    Tag a batch of scraped records in place, in one scoring pass
+
+    Articles keep any tags their feed supplied, followed by the predicted
+    ones; enrichments get the predicted tags.
+
+    Args:
+        records: List of {"article": dict, "enrichments": list}
+    """
+    targets, texts = [], []
+    for record in records:
+        article = record["article"]
+        targets.append(article)
+        texts.append((article.get("title"), article.get("summary")))
+        for enrichment in record.get("enrichments") or []:
+            targets.append(enrichment)
+            texts.append((enrichment.get("title"), f"{enrichment.get('summary') or ''} {enrichment.get('content') or ''}"))
+
+    for target, tags in zip(targets, tag(texts)):
+        supplied = [t for t in target.get("tags") or [] if t not in tags]
+        target["tags"] = supplied + tags
+
+
+def _bench(seconds):
+    """Tag synthetic newsletter items for a few seconds and report throughput"""
+    vocabulary = [w for keywords in LABELS.values() for k in keywords for w in k.split()]
+    vocabulary += [f"word{i}" for i in range(5000)]
+    rng = np.random.RandomState(0)
+
+    def item():
+        title = " ".join(rng.choice(vocabulary, 10))
+        body = " ".join(rng.choice(vocabulary, 150))
+        return (title, body)
+
+    batch = [item() for _ in range(1000)]
+    tag(batch)  # warm up
+
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        tag(batch)
+        done += len(batch)
+    elapsed = time.perf_counter() - start
+    print(f"🏷️  {done} items in {elapsed:.2f}s: {done / elapsed:,.0f} items/s (batches of {len(batch)}, ~160 words each)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag text with topic labels")
+    parser.add_argument("text", nargs="*", help="Title (and text) to tag")
+    parser.add_argument("--bench", action="store_true", help="Measure tagging throughput")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Benchmark duration")
+    args = parser.parse_args()
+
+    if args.bench:
+        _bench(args.seconds)
+        return
+
+    text = " ".join(args.text)
+    scores = score([(text, "")])[0]
+    for j in np.argsort(-scores):
+        if scores[j] > 0:
+            print(f"{scores[j]:.3f}  {_LABEL_NAMES[j]}")
+    print(f"🏷️  {tag([(text, '')])[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,11 @@ import os
 from datetime import datetime, timedelta
 from supabase import create_client, Client
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "tools"))
+from postgrest_reader import iter_rows
 
 # Load environment variables
 load_dotenv()
@@ -17,13 +22,13 @@ supabase: Client = create_client(url, key)
 
 print("🔄 Updating article dates to current time...\n")
 
-# Get all articles
-response = supabase.table('articles').select('*').execute()
-articles = response.data
-
 now = datetime.now()
 
-for i, article in enumerate(articles):
+# Stream articles page by page; the keyset cursor is on id, so rewriting
+# published_date mid-read doesn't disturb the paging. Articles come in id
+# (uuid) order, which is arbitrary, so the new dates follow no particular
+# article order
+for i, article in enumerate(iter_rows(url, key, 'articles', 'id,title')):
     # Set each article to a time within the last few hours
     new_date = now - timedelta(hours=i)
 